@@ -1,160 +1,249 @@
-import sqlite3
+import itertools
 import random
 import os
+import time
+
+from kitchen_pool import get_pool, close_pool, record_pool_stats
+from kitchen_schema import PIZZA_INGREDIENTS, FETCH_INGREDIENT_SQL
+from kitchen_datagen import build_ingredients_database
+from kitchen_numpy import get_processor
+from kitchen_inventory import StockLedger, record_stock_stats
+from kitchen_costs import CostMeter, print_measured_usage
+from kitchen_trace import traced, wrap
+from kitchen_workload import timed_orders
 
 class KitchenDemo:
+    # Additive counters, summed by merge() when combining per-worker results
+    COUNTERS = (
+        'orders_completed', 'cpu_operations', 'memory_allocations', 'storage_trips',
+        'pool_hits', 'pool_misses', 'pool_waits', 'pool_wait_time_s',
+        'stock_flushes', 'stock_rows_written', 'stock_write_time_s', 'stock_lock_wait_s', 'stock_lock_retries',
+    )
+    
     def __init__(self):
         self.orders_completed = 0
-        self.total_cost_zar = 0  
         self.cpu_operations = 0
         self.memory_allocations = 0
         self.storage_trips = 0
         
-        # GCP pricing in ZAR (R17.00 / $1.00 - current 2024 rate)
-        self.ZAR_PER_USD = 17.00
+        # Connection pool counters (real latency, not modeled cost)
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.pool_waits = 0
+        self.pool_wait_time_s = 0.0
+        self.elapsed_s = 0.0
+        
+        # Stock consumption (order-fulfilment mode)
+        self.stock_flushes = 0
+        self.stock_rows_written = 0
+        self.stock_write_time_s = 0.0
+        self.stock_lock_wait_s = 0.0
+        self.stock_lock_retries = 0
         
-        # GCP Cloud SQL and Compute costs (realistic)
-        self.cost_per_cpu_op_usd = 0.000000008      # Higher for GCP
-        self.cost_per_memory_mb_usd = 0.000000015   # GCP memory pricing
-        self.cost_per_db_query_usd = 0.000006       # Cloud SQL query cost
+        # Per-order service times and arrivals, recorded only when replaying a workload stream
+        self.order_service_s = []
+        self.order_arrival_s = []
         
-        self.cost_per_cpu_op_zar = self.cost_per_cpu_op_usd * self.ZAR_PER_USD
-        self.cost_per_memory_mb_zar = self.cost_per_memory_mb_usd * self.ZAR_PER_USD
-        self.cost_per_db_query_zar = self.cost_per_db_query_usd * self.ZAR_PER_USD
+        # GCP costs in ZAR, derived from measured CPU time, memory, queries and bytes
+        self.meter = CostMeter()
+    
+    @property
+    def total_cost_zar(self):
+        return self.meter.total_cost_zar()
     
     def reset_stats(self):
         self.orders_completed = 0
-        self.total_cost_zar = 0
+        self.meter = CostMeter()
+        self.order_service_s = []
+        self.order_arrival_s = []
         self.cpu_operations = 0
         self.memory_allocations = 0
         self.storage_trips = 0
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.pool_waits = 0
+        self.pool_wait_time_s = 0.0
+        self.elapsed_s = 0.0
+        self.stock_flushes = 0
+        self.stock_rows_written = 0
+        self.stock_write_time_s = 0.0
+        self.stock_lock_wait_s = 0.0
+        self.stock_lock_retries = 0
+
+    def merge(self, other):
+        """Fold another KitchenDemo's counters into this one (e.g. from a worker process)"""
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.meter.merge(other.meter)
+        self.order_service_s.extend(other.order_service_s)
+        self.order_arrival_s.extend(other.order_arrival_s)
+        self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+        return self
+
+    def to_dict(self):
+        """Counters, timings and measured costs as plain (JSON-serialisable) data"""
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result['elapsed_s'] = self.elapsed_s
+        result['total_cost_zar'] = self.total_cost_zar
+        result.update(self.meter.to_dict())
+        return result
 
 DB_PATH = 'chaotic_kitchen.db'
 
-def setup_database():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+@traced()
+def setup_database(schema='indexed', rows_per_ingredient=250, seed=None, fixtures=False, names=PIZZA_INGREDIENTS):
+    # Pooled connections point at the old file - drop them before deleting it
+    close_pool(DB_PATH)
+    for path in (DB_PATH, DB_PATH + '-wal', DB_PATH + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER, cost REAL)')
-    
-    ingredients = []
-    for name in ['dough', 'sauce', 'cheese', 'pepperoni']:
-        for _ in range(250):
-            ingredients.append((name, random.randint(100, 500), random.uniform(1.0, 5.0)))
-    
-    conn.executemany('INSERT INTO ingredients (name, quantity, cost) VALUES (?, ?, ?)', ingredients)
-    conn.commit()
-    conn.close()
+    # Indexed schema by default; EXPLAIN QUERY PLAN confirms the fetch path uses it.
+    # fixtures=True copies a pre-built database for this (schema, rows, seed) when one exists
+    build_ingredients_database(DB_PATH, schema, rows_per_ingredient, names, seed, fixtures)
 
 def fetch_ingredient_data(ingredient_name):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute('SELECT quantity, cost FROM ingredients WHERE name = ? LIMIT 250', (ingredient_name,))
-    data = cursor.fetchall()
-    conn.close()
+    # Reuse a pooled connection (and its cached prepared statement)
+    with get_pool(DB_PATH).connection() as conn:
+        cursor = conn.execute(FETCH_INGREDIENT_SQL, (ingredient_name,))
+        data = cursor.fetchall()
     return data, len(data) + 100 
 
 def process_ingredient_data(ingredient_data):
     processed = [(qty * 2 + random.randint(1, 10), cost * 1.1) for qty, cost in ingredient_data]
     return processed, len(ingredient_data) + 1
 
-def chaotic_kitchen_demo(num_orders_to_show):
+def make_pizza(demo, process=process_ingredient_data, ledger=None, fetch=fetch_ingredient_data, order=PIZZA_INGREDIENTS):
+    """One chaotic order: a separate DB round trip per ingredient, then process each one"""
+    # 1. Fetching every ingredient from the DB, one query each
+    fetched = []
+    for ingredient_name in order:
+        data, cpu_ops = demo.meter.query(fetch, ingredient_name)
+        demo.storage_trips += 1
+        demo.cpu_operations += cpu_ops
+        demo.memory_allocations += len(data) / 1000
+        fetched.append(data)
+    
+    # 2. Using each ingredient
+    for data in fetched:
+        processed, ops = process(data)
+        demo.cpu_operations += ops
+    
+    # 3. Deducting stock (only in order-fulfilment mode)
+    if ledger is not None and ledger.consume(order):
+        demo.storage_trips += 1
+        demo.meter.record_query(latency_s=ledger.last_flush_s)
+    
+    demo.orders_completed += 1
+
+def chaotic_kitchen_demo(num_orders_to_show, processor='python', fulfil=False, flush_size=1, flush_interval_s=None,
+                         storage=None, rows_per_ingredient=250, seed=None, verbose=True, progress=None,
+                         progress_every=1000, orders=None, ingredients=PIZZA_INGREDIENTS):
+    """
+    Run the N+4 kitchen and return its KitchenDemo (demo.to_dict() for JSON).
+    verbose=False prints nothing and does no per-order formatting;
+    progress(done, total) is called every progress_every orders.
+    orders replays a stream of ingredient-name tuples (e.g. kitchen_workload)
+    instead of identical pizzas; ingredients must cover every name it uses.
+    """
     demo = KitchenDemo()
-    print("\n" + "="*70)
-    print("🍕 DOUGH RE MI - CHAOTIC KITCHEN DEMO 🍕")
-    print("="*70)
-    print("📊 Demonstrating: N+4 Query Problem (Classic Anti-Pattern)")
-    print("🏢 Business Case: Debonairs Pizza SA Daily Operations")
-    print("☁️  Cloud Platform: Google Cloud Platform (GCP)")
-    print("💰 Currency: South African Rand (ZAR) @ R17.00/$1.00")
-    print("="*70)
+    # 'python' = per-row list comprehension, 'numpy' = vectorized columns
+    process = process_ingredient_data if processor == 'python' else get_processor(processor, seed)
+    # Pluggable storage, e.g. kitchen_latency.SimulatedLatencyStorage for Cloud SQL round trips
+    fetch = storage.wrap(fetch_ingredient_data) if storage is not None else fetch_ingredient_data
+    # Wrapped for tracing once, up front - untraced runs call the plain functions
+    process = wrap(process, 'process_ingredient_data')
+    fetch = wrap(fetch, 'fetch_ingredient_data')
+    make_order = wrap(make_pizza, 'order')
+    # Identical pizzas by default; a replayed stream also records per-order service times
+    order_stream = itertools.repeat(PIZZA_INGREDIENTS) if orders is None else iter(orders)
+    if orders is not None:
+        make_order = timed_orders(demo, make_order)
+    if verbose:
+        print("\n" + "="*70)
+        print("🍕 DOUGH RE MI - CHAOTIC KITCHEN DEMO 🍕")
+        print("="*70)
+        print("📊 Demonstrating: N+4 Query Problem (Classic Anti-Pattern)")
+        print("🏢 Business Case: Debonairs Pizza SA Daily Operations")
+        print("☁️  Cloud Platform: Google Cloud Platform (GCP)")
+        print("💰 Currency: South African Rand (ZAR) @ R17.00/$1.00")
+        print("="*70)
     
-    setup_database()
-    print("\n🔧 SETUP COMPLETE:")
-    print(f"   ✅ Database initialized: {DB_PATH}")
-    print("   ⚠️  Each pizza requires 4 separate database round trips")
-    print(f"   🎯 Processing {num_orders_to_show:,} pizzas for demo\n")
+    setup_database(rows_per_ingredient=rows_per_ingredient, seed=seed, names=ingredients)
+    if verbose:
+        print("\n🔧 SETUP COMPLETE:")
+        print(f"   ✅ Database initialized: {DB_PATH}")
+        print(f"   🧮 Ingredient processor: {processor}")
+        print("   ⚠️  Each pizza requires one database round trip per ingredient")
+        print(f"   🎯 Processing {num_orders_to_show:,} pizzas for demo\n")
+        if progress is None:
+            progress = print_progress
     
-    # Processing pizzas with N+4 query problem
+    # Order fulfilment: deduct stock per pizza (default flush_size=1 = one write transaction per pizza)
+    ledger = StockLedger(DB_PATH, flush_size, flush_interval_s) if fulfil else None
     
+    # Processing pizzas with N+4 query problem
     
-    for order in range(num_orders_to_show):
-        order_cost_start = demo.total_cost_zar
-        
-        if order < 5:  # Show first 5 orders for demo
-            print(f"🍕 Pizza #{order + 1}: Making 4 separate DB calls...")
-        elif (order + 1) % 1000 == 0:  # Progress updates every 1000 pizzas
-            print(f"   📈 Progress: {order + 1:,} pizzas completed...")
-        
-        # 1. Fetching Dough from DB
-        dough_data, cpu_ops = fetch_ingredient_data('dough')
-        demo.storage_trips += 1
-        demo.cpu_operations += cpu_ops
-        demo.memory_allocations += len(dough_data) / 1000  
-        step_cost = demo.cost_per_db_query_zar + (cpu_ops * demo.cost_per_cpu_op_zar) + (len(dough_data) / 1000 * demo.cost_per_memory_mb_zar)
-        demo.total_cost_zar += step_cost
-        
-        # 2. Fetching Sauce from DB
-        sauce_data, cpu_ops = fetch_ingredient_data('sauce')
-        demo.storage_trips += 1
-        demo.cpu_operations += cpu_ops
-        demo.memory_allocations += len(sauce_data) / 1000
-        step_cost = demo.cost_per_db_query_zar + (cpu_ops * demo.cost_per_cpu_op_zar) + (len(sauce_data) / 1000 * demo.cost_per_memory_mb_zar)
-        demo.total_cost_zar += step_cost
-        
-        # 3. Fetching Cheese from DB
-        cheese_data, cpu_ops = fetch_ingredient_data('cheese')
-        demo.storage_trips += 1
-        demo.cpu_operations += cpu_ops
-        demo.memory_allocations += len(cheese_data) / 1000
-        step_cost = demo.cost_per_db_query_zar + (cpu_ops * demo.cost_per_cpu_op_zar) + (len(cheese_data) / 1000 * demo.cost_per_memory_mb_zar)
-        demo.total_cost_zar += step_cost
-        
-        # 4. Fetching Pepperoni from DB
-        pepperoni_data, cpu_ops = fetch_ingredient_data('pepperoni')
-        demo.storage_trips += 1
-        demo.cpu_operations += cpu_ops
-        step_cost = demo.cost_per_db_query_zar + (cpu_ops * demo.cost_per_cpu_op_zar) + (len(pepperoni_data) / 1000 * demo.cost_per_memory_mb_zar)
-        demo.total_cost_zar += step_cost
-        
-        # 1. Using Dough
-        processed_dough, ops = process_ingredient_data(dough_data)
-        demo.cpu_operations += ops
-        demo.total_cost_zar += (ops * demo.cost_per_cpu_op_zar)
+    start_time = time.perf_counter()
+    with demo.meter.phase('orders'):
+        # Show the first 5 orders in detail; the rest run in tight chunks between progress reports
+        shown = min(5, num_orders_to_show) if verbose else 0
+        for number, order in zip(range(shown), order_stream):
+            order_cost_start = demo.total_cost_zar
+            print(f"🍕 Pizza #{number + 1}: Making {len(order)} separate DB calls...")
+            make_order(demo, process, ledger, fetch, order)
+            order_total_cost = demo.total_cost_zar - order_cost_start
+            print(f"   💸 Cost: R{order_total_cost:.6f} ({len(order)} DB queries for this pizza)\n")
+        if verbose and num_orders_to_show > shown:
+            print(f"   ⏳ Processing remaining pizzas (progress updates every {progress_every:,})...\n")
         
-        # 2. Using Sauce
-        processed_sauce, ops = process_ingredient_data(sauce_data)
-        demo.cpu_operations += ops
-        demo.total_cost_zar += (ops * demo.cost_per_cpu_op_zar)
-        
-        # 3. Using Cheese
-        processed_cheese, ops = process_ingredient_data(cheese_data)
-        demo.cpu_operations += ops
-        demo.total_cost_zar += (ops * demo.cost_per_cpu_op_zar)
-        
-        # 4. Using Pepperoni
-        processed_pepperoni, ops = process_ingredient_data(pepperoni_data)
-        demo.cpu_operations += ops
-        demo.total_cost_zar += (ops * demo.cost_per_cpu_op_zar)
-        
-        demo.orders_completed += 1
-        
-        order_total_cost = demo.total_cost_zar - order_cost_start
-        if order < 5:
-            print(f"   💸 Cost: R{order_total_cost:.4f} (4 DB queries per pizza)\n")
-        elif order == 5:
-            print("   ⏳ Processing remaining pizzas (progress updates every 1000)...\n")
+        done = demo.orders_completed
+        while done < num_orders_to_show:
+            stop = num_orders_to_show if progress is None else min(
+                (done // progress_every + 1) * progress_every, num_orders_to_show)
+            for order in itertools.islice(order_stream, stop - done):
+                make_order(demo, process, ledger, fetch, order)
+            if demo.orders_completed < stop:
+                break  # The order stream ran dry
+            done = stop
+            if progress is not None:
+                progress(done, num_orders_to_show)
         
+        if ledger is not None:
+            if ledger.flush():
+                demo.storage_trips += 1
+                demo.meter.record_query(latency_s=ledger.last_flush_s)
+            record_stock_stats(demo, ledger)
+    demo.elapsed_s = time.perf_counter() - start_time
+    record_pool_stats(demo, get_pool(DB_PATH))
     
+    if verbose:
+        print_results(demo, storage, ledger)
+    return demo
+
+def print_progress(done, total):
+    print(f"   📈 Progress: {done:,} pizzas completed...")
+
+def print_results(demo, storage=None, ledger=None):
     cost_per_order = demo.total_cost_zar / demo.orders_completed
     
     print("\n" + "="*50)
     print("📊 CHAOTIC KITCHEN RESULTS")
     print("="*50)
     print(f"🍕 Total Pizzas Processed: {demo.orders_completed:,}")
-    print(f"🔄 Total DB Queries: {demo.storage_trips:,} (4 per pizza - N+4 Problem)")
-    print(f"💰 Cost per Pizza: R{cost_per_order:.4f}")
-    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.2f}")
+    print(f"🔄 Total DB Queries: {demo.storage_trips:,} ({demo.storage_trips / demo.orders_completed:.1f} per pizza - N+4 Problem)")
+    print(f"💰 Cost per Pizza: R{cost_per_order:.6f}")
+    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.4f}")
+    print_measured_usage(demo.meter)
+    print(f"⏱️  Wall-clock Time: {demo.elapsed_s:.2f}s ({demo.elapsed_s / demo.orders_completed * 1000:.3f} ms per pizza)")
+    print(f"🔌 Connection Pool: {demo.pool_hits:,} reused / {demo.pool_misses:,} opened, {demo.pool_wait_time_s * 1000:.1f} ms waiting")
+    if storage is not None:
+        latency_ms = storage.percentiles()
+        print(f"🌐 Simulated Query Latency: p50 {latency_ms[50]:.2f} ms / p99 {latency_ms[99]:.2f} ms over {storage.queries:,} queries")
+    if ledger is not None:
+        write_rate = demo.stock_rows_written / demo.stock_write_time_s if demo.stock_write_time_s else 0
+        print(f"📦 Stock Writes: {demo.stock_rows_written:,} rows in {demo.stock_flushes:,} transactions "
+              f"({write_rate:,.0f} rows/s, {demo.stock_lock_wait_s * 1000:.1f} ms lock wait, {demo.stock_lock_retries} retries)")
     
     print(f"\n⚡ GCP PERFORMANCE IMPACT:")
     print(f"   🔴 CPU Utilization: HIGH (excessive I/O blocking)")
@@ -168,8 +257,6 @@ def chaotic_kitchen_demo(num_orders_to_show):
     print(f"   🌐 Higher VPC network egress costs")
     print(f"   ⏰ Cloud Functions timeout risk (540s limit)")
 
-    return demo
-
 if __name__ == "__main__":
     # Demo with limited volume (chaotic is slow)
     print("Running demo with 15,000 pizzas (scaled to show Debonairs impact)\n")
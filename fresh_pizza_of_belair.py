@@ -1,52 +1,158 @@
-import sqlite3
+import itertools
 import random
 import os
+import sqlite3
+import time
+
+from kitchen_pool import get_pool, close_pool, record_pool_stats
+from kitchen_schema import PIZZA_INGREDIENTS, FETCH_INGREDIENT_SQL
+from kitchen_datagen import build_ingredients_database, build_info
+from kitchen_numpy import get_processor
+from kitchen_cache import IngredientCache, notify_ingredients_changed, record_cache_stats
+from kitchen_inventory import StockLedger, record_stock_stats
+from kitchen_costs import CostMeter, print_measured_usage
+from kitchen_store import IngredientStore
+from kitchen_precompute import refresh_precomputed
+from kitchen_trace import traced, wrap
+from kitchen_workload import timed_orders
 
 class KitchenDemo:
+    # Additive counters, summed by merge() when combining per-worker results
+    COUNTERS = (
+        'orders_completed', 'cpu_operations', 'memory_allocations', 'storage_trips',
+        'pool_hits', 'pool_misses', 'pool_waits', 'pool_wait_time_s',
+        'stock_flushes', 'stock_rows_written', 'stock_write_time_s', 'stock_lock_wait_s', 'stock_lock_retries',
+        'cache_hits', 'cache_misses', 'cache_evictions', 'cache_expirations', 'cache_invalidations',
+    )
+    
     def __init__(self):
         self.orders_completed = 0
-        self.total_cost_zar = 0  
         self.cpu_operations = 0
         self.memory_allocations = 0
         self.storage_trips = 0
         
-        # GCP pricing in ZAR (R17.00 / $1.00 - current 2024 rate)
-        self.ZAR_PER_USD = 17.00
-        self.cost_per_cpu_op_zar = 0.000000003 * self.ZAR_PER_USD  # Optimized CPU usage
-        self.cost_per_memory_mb_zar = 0.000000008 * self.ZAR_PER_USD  # Efficient memory
-        self.cost_per_db_query_zar = 0.000006 * self.ZAR_PER_USD # Cloud SQL query cost
+        # Connection pool counters (real latency, not modeled cost)
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.pool_waits = 0
+        self.pool_wait_time_s = 0.0
+        self.elapsed_s = 0.0
+        
+        # Stock consumption (order-fulfilment mode)
+        self.stock_flushes = 0
+        self.stock_rows_written = 0
+        self.stock_write_time_s = 0.0
+        self.stock_lock_wait_s = 0.0
+        self.stock_lock_retries = 0
+        
+        # Ingredient cache counters ("zero DB calls" only counts fresh hits)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self.cache_expirations = 0
+        self.cache_invalidations = 0
+        
+        # Per-order service times and arrivals, recorded only when replaying a workload stream
+        self.order_service_s = []
+        self.order_arrival_s = []
+        
+        # GCP costs in ZAR, derived from measured CPU time, memory, queries and bytes
+        self.meter = CostMeter()
+    
+    @property
+    def total_cost_zar(self):
+        return self.meter.total_cost_zar()
     
     def reset_stats(self):
         self.orders_completed = 0
-        self.total_cost_zar = 0
+        self.meter = CostMeter()
+        self.order_service_s = []
+        self.order_arrival_s = []
         self.cpu_operations = 0
         self.memory_allocations = 0
         self.storage_trips = 0
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.pool_waits = 0
+        self.pool_wait_time_s = 0.0
+        self.elapsed_s = 0.0
+        self.stock_flushes = 0
+        self.stock_rows_written = 0
+        self.stock_write_time_s = 0.0
+        self.stock_lock_wait_s = 0.0
+        self.stock_lock_retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self.cache_expirations = 0
+        self.cache_invalidations = 0
+
+    def merge(self, other):
+        """Fold another KitchenDemo's counters into this one (e.g. from a worker process)"""
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.meter.merge(other.meter)
+        self.order_service_s.extend(other.order_service_s)
+        self.order_arrival_s.extend(other.order_arrival_s)
+        self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+        return self
+
+    def to_dict(self):
+        """Counters, timings and measured costs as plain (JSON-serialisable) data"""
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result['elapsed_s'] = self.elapsed_s
+        result['total_cost_zar'] = self.total_cost_zar
+        result.update(self.meter.to_dict())
+        return result
 
 DB_PATH = 'kitchen_ingredients.db'
 
-def setup_database():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-    
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER, cost REAL)')
+@traced()
+def setup_database(schema='indexed', rows_per_ingredient=250, seed=None, fixtures=False, reuse=False,
+                   names=PIZZA_INGREDIENTS):
+    """
+    (Re)create the ingredients database. reuse=True keeps an existing file
+    built from the same schema, rows, names and seed - along with its
+    precomputed results - and returns False; otherwise the database is
+    rebuilt and True is returned.
+    """
+    if reuse and existing_build_info() == build_info(schema, rows_per_ingredient, names, seed):
+        return False
     
-    # Create diverse ingredient data
-    ingredients = []
-    for name in ['dough', 'sauce', 'cheese', 'pepperoni']:
-        for _ in range(250):
-            ingredients.append((name, random.randint(100, 500), random.uniform(1.0, 5.0)))
+    # Pooled connections point at the old file - drop them before deleting it
+    close_pool(DB_PATH)
+    for path in (DB_PATH, DB_PATH + '-wal', DB_PATH + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
     
-    conn.executemany('INSERT INTO ingredients (name, quantity, cost) VALUES (?, ?, ?)', ingredients)
-    conn.commit()
-    conn.close()
+    # Indexed schema by default; EXPLAIN QUERY PLAN confirms the fetch path uses it.
+    # fixtures=True copies a pre-built database for this (schema, rows, seed) when one exists
+    build_ingredients_database(DB_PATH, schema, rows_per_ingredient, names, seed, fixtures)
+    notify_ingredients_changed(DB_PATH)
+    return True
+
+def existing_build_info():
+    """The build_info DB_PATH was generated with, or None when there is no usable database"""
+    if not os.path.exists(DB_PATH):
+        return None
+    try:
+        with get_pool(DB_PATH).connection() as conn:
+            return dict(conn.execute('SELECT key, value FROM build_info'))
+    except sqlite3.DatabaseError:
+        return None
+
+def adjust_ingredient_quantity(ingredient_name, delta):
+    """Write path for inventory changes - invalidates cached copies of the ingredient"""
+    with get_pool(DB_PATH).connection() as conn:
+        conn.execute('UPDATE ingredients SET quantity = quantity + ? WHERE name = ?', (delta, ingredient_name))
+        conn.commit()
+    notify_ingredients_changed(DB_PATH, [ingredient_name])
 
 def fetch_ingredient_data(ingredient_name):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute('SELECT quantity, cost FROM ingredients WHERE name = ? LIMIT 250', (ingredient_name,))
-    data = cursor.fetchall()
-    conn.close()
+    # Reuse a pooled connection (and its cached prepared statement)
+    with get_pool(DB_PATH).connection() as conn:
+        cursor = conn.execute(FETCH_INGREDIENT_SQL, (ingredient_name,))
+        data = cursor.fetchall()
     return data, len(data) + 100 
 
 def process_ingredient_data(ingredient_data):
@@ -54,102 +160,225 @@ def process_ingredient_data(ingredient_data):
     return processed, len(ingredient_data) + 1
  
 
-def optimised_kitchen_demo(num_orders_to_show):
+def fetch_all_ingredients():
+    # OPTIMIZATION 1: Single pooled connection for all batching
+    # OPTIMIZATION 2: Fetch ALL ingredients in one mega-query, streamed into flat columns
+    return IngredientStore.load(DB_PATH)
+
+def warm_ingredient_cache(demo, processed_cache, process=process_ingredient_data, fetch_all=fetch_all_ingredients,
+                          store=None):
+    """
+    PHASE 1: one mega-query, process every ingredient once and fill the cache.
+    Pass an already-loaded IngredientStore (e.g. a shared-memory snapshot) to skip the query.
+    """
+    if store is None:
+        query_start = time.perf_counter()
+        store = fetch_all()
+        demo.meter.record_query(len(store), store.nbytes, time.perf_counter() - query_start)
+        demo.storage_trips += 1  # Only ONE database trip for everything!
+    demo.cpu_operations += 500  # Reduced overhead
+    
+    # OPTIMIZATION 3: Rows are already grouped by ingredient - process zero-copy column slices
+    # once into a bounded cache that is dropped on inventory writes
+    for ingredient_name, data in store.items():
+        processed_data, cpu_ops = process(data)
+        demo.cpu_operations += cpu_ops
+        processed_cache.put(ingredient_name, processed_data)
+    return store
+
+def warm_from_precomputed(demo, processed_cache, process=process_ingredient_data, processor='python'):
+    """
+    PHASE 1 for warm starts: read stored results for unchanged ingredients and
+    fetch + process only the names whose rows changed since they were stored.
+    """
+    query_start = time.perf_counter()
+    result = refresh_precomputed(DB_PATH, process, processor)
+    demo.meter.record_query(result.rows_fetched, result.bytes_read, time.perf_counter() - query_start,
+                            queries=result.queries)
+    demo.storage_trips += result.queries  # Versions + stored results, then any changed rows and their rewrite
+    demo.cpu_operations += 500 + result.cpu_operations
+    for ingredient_name, processed_data in result.processed.items():
+        processed_cache.put(ingredient_name, processed_data)
+    return result
+
+def assemble_pizza(demo, processed_cache, process=process_ingredient_data, ledger=None, fetch=fetch_ingredient_data,
+                   order=PIZZA_INGREDIENTS):
+    """PHASE 2: one order from cache; returns how many ingredients had to be refetched"""
+    # OPTIMIZATION 5: Use cached data - NO database calls while it is fresh!
+    refetched = 0
+    for ingredient_name in order:
+        if processed_cache.get(ingredient_name) is None:
+            # Evicted, expired or invalidated - go back to the database
+            data, cpu_ops = demo.meter.query(fetch, ingredient_name)
+            processed_data, ops = process(data)
+            processed_cache.put(ingredient_name, processed_data)
+            demo.storage_trips += 1
+            demo.cpu_operations += cpu_ops + ops
+            refetched += 1
+    
+    # Minimal CPU for assembly (no DB overhead)
+    demo.cpu_operations += 2  # Ultra-minimal assembly work
+    
+    if ledger is not None and ledger.consume(order):
+        # One write transaction per flush_size pizzas (invalidates cached stock)
+        demo.storage_trips += 1
+        demo.meter.record_query(latency_s=ledger.last_flush_s)
+    
+    demo.orders_completed += 1
+    return refetched
+
+def optimised_kitchen_demo(num_orders_to_show, processor='python', cache_size=128, cache_ttl_s=None,
+                           fulfil=False, flush_size=500, flush_interval_s=None, storage=None,
+                           rows_per_ingredient=250, seed=None, verbose=True, progress=None, progress_every=10000,
+                           precompute=False, orders=None, ingredients=PIZZA_INGREDIENTS):
     """
     ULTRA-OPTIMIZED function with advanced batching, caching, and connection pooling.
+    verbose=False prints nothing and does no per-order formatting;
+    progress(done, total) is called every progress_every orders.
+    precompute=True keeps the database between runs and reprocesses only
+    ingredients whose rows changed since the last run.
+    orders replays a stream of ingredient-name tuples (e.g. kitchen_workload)
+    instead of identical pizzas; ingredients must cover every name it uses.
     """
     demo = KitchenDemo()
-    print("\n" + "="*70)
-    print("🍕 FRESH PIZZA OF BEL-AIR - ULTRA-OPTIMIZED KITCHEN 🍕")
-    print("="*70)
-    print("⚡ Demonstrating: Advanced Batching, Caching & Connection Pooling")
-    print("🏢 Business Case: Debonairs Pizza SA Daily Operations")
-    print("☁️  Cloud Platform: Google Cloud Platform (GCP)")
-    print("💰 Currency: South African Rand (ZAR) @ R17.00/$1.00")
-    print("="*70)
+    # 'python' = per-row list comprehension, 'numpy' = vectorized columns
+    process = process_ingredient_data if processor == 'python' else get_processor(processor, seed)
+    # Pluggable storage, e.g. kitchen_latency.SimulatedLatencyStorage for Cloud SQL round trips
+    fetch = storage.wrap(fetch_ingredient_data) if storage is not None else fetch_ingredient_data
+    fetch_all = storage.wrap(fetch_all_ingredients) if storage is not None else fetch_all_ingredients
+    # Wrapped for tracing once, up front - untraced runs call the plain functions
+    process = wrap(process, 'process_ingredient_data')
+    fetch = wrap(fetch, 'fetch_ingredient_data')
+    fetch_all = wrap(fetch_all, 'fetch_all_ingredients')
+    assemble_order = wrap(assemble_pizza, 'order')
+    # Identical pizzas by default; a replayed stream also records per-order service times
+    order_stream = itertools.repeat(PIZZA_INGREDIENTS) if orders is None else iter(orders)
+    if orders is not None:
+        assemble_order = timed_orders(demo, assemble_order)
+    if verbose:
+        print("\n" + "="*70)
+        print("🍕 FRESH PIZZA OF BEL-AIR - ULTRA-OPTIMIZED KITCHEN 🍕")
+        print("="*70)
+        print("⚡ Demonstrating: Advanced Batching, Caching & Connection Pooling")
+        print("🏢 Business Case: Debonairs Pizza SA Daily Operations")
+        print("☁️  Cloud Platform: Google Cloud Platform (GCP)")
+        print("💰 Currency: South African Rand (ZAR) @ R17.00/$1.00")
+        print("="*70)
     
-    setup_database()
-    print("\n🔧 SETUP COMPLETE:")
-    print(f"   ✅ Database initialized: {DB_PATH}")
-    print("   ⚡ Applying ULTRA-EFFICIENT strategy with minimal DB overhead")
-    print(f"   🎯 Processing {num_orders_to_show:,} pizzas with maximum efficiency\n")
+    rebuilt = setup_database(rows_per_ingredient=rows_per_ingredient, seed=seed, reuse=precompute, names=ingredients)
+    if verbose:
+        print("\n🔧 SETUP COMPLETE:")
+        print(f"   ✅ Database {'initialized' if rebuilt else 'reused'}: {DB_PATH}")
+        print(f"   🧮 Ingredient processor: {processor}")
+        print("   ⚡ Applying ULTRA-EFFICIENT strategy with minimal DB overhead")
+        print(f"   🎯 Processing {num_orders_to_show:,} pizzas with maximum efficiency\n")
+        if progress is None:
+            progress = print_progress
     
     # Ultra-efficient processing with single mega-query
     
     # --- PHASE 1: ULTRA-BATCHING STRATEGY ---
-    print("🚀 PHASE 1: Ultra-batching ALL ingredients (SINGLE DB CONNECTION)")
+    if verbose:
+        print("🚀 PHASE 1: Ultra-batching ALL ingredients (SINGLE DB CONNECTION)")
     
-    # OPTIMIZATION 1: Single connection for all batching
-    conn = sqlite3.connect(DB_PATH)
+    start_time = time.perf_counter()
     
-    # OPTIMIZATION 2: Fetch ALL ingredients in one mega-query
-    cursor = conn.execute('SELECT name, quantity, cost FROM ingredients ORDER BY name')
-    all_ingredients = cursor.fetchall()
-    conn.close()
+    processed_cache = IngredientCache(max_entries=cache_size, ttl_s=cache_ttl_s)
+    processed_cache.watch(DB_PATH)
+    # Stop receiving inventory notifications however the run ends
+    try:
+        with demo.meter.phase('batch'):
+            if precompute:
+                precomputed = warm_from_precomputed(demo, processed_cache, process, processor)
+            else:
+                store = warm_ingredient_cache(demo, processed_cache, process, fetch_all)
+        if verbose:
+            if precompute:
+                print(f"   ♻️  Reused {len(precomputed.reused)} precomputed ingredients, "
+                      f"reprocessed {len(precomputed.recomputed)} ({precomputed.rows_fetched:,} rows fetched)")
+                batch_label = (f"{precomputed.queries} queries: versions, stored results"
+                               f"{', changed rows and their new results' if precomputed.recomputed else ' - no ingredient rows fetched'}")
+            else:
+                for ingredient_name, data in store.items():
+                    print(f"   💾 Cached {ingredient_name}: {len(data)} records")
+                print(f"   🗃️  Columnar store: {len(store):,} rows in {store.nbytes / 1024:.1f} KB")
+                batch_label = "SINGLE query for ALL ingredients!"
+            print(f"   💰 Total batching cost: R{demo.meter.total_cost_zar('batch'):.6f} ({batch_label})")
+            print(f"\n🍕 PHASE 2: Processing {num_orders_to_show:,} pizzas (ZERO additional DB calls!)")
     
-    demo.storage_trips += 1  # Only ONE database trip for everything!
-    demo.cpu_operations += 500  # Reduced overhead
+        # OPTIMIZATION 4: Buffer stock decrements and flush them in batched transactions
+        ledger = StockLedger(DB_PATH, flush_size, flush_interval_s) if fulfil else None
     
-    # OPTIMIZATION 3: Group and cache by ingredient type
-    ingredient_cache = {}
-    for name, qty, cost in all_ingredients:
-        if name not in ingredient_cache:
-            ingredient_cache[name] = []
-        ingredient_cache[name].append((qty, cost))
-    
-    # Process all ingredients once
-    processed_cache = {}
-    for ingredient_name, data in ingredient_cache.items():
-        processed_data, cpu_ops = process_ingredient_data(data)
-        demo.cpu_operations += cpu_ops
-        processed_cache[ingredient_name] = processed_data
-        print(f"   💾 Cached {ingredient_name}: {len(data)} records")
+        with demo.meter.phase('assembly'):
+            # Show the first 5 orders in detail; the rest run in tight chunks between progress reports
+            shown = min(5, num_orders_to_show) if verbose else 0
+            for number, order in zip(range(shown), order_stream):
+                order_cost_start = demo.total_cost_zar
+                refetched = assemble_order(demo, processed_cache, process, ledger, fetch, order)
+                order_total_cost = demo.total_cost_zar - order_cost_start
+                if refetched:
+                    print(f"   🍕 Pizza #{number + 1}: R{order_total_cost:.8f} ({refetched} cache misses refetched)")
+                else:
+                    print(f"   🍕 Pizza #{number + 1}: R{order_total_cost:.8f} (ZERO DB queries - pure cache!)")
+            if verbose and num_orders_to_show > shown:
+                print(f"   ⚡ Processing remaining pizzas from cache (progress updates every {progress_every:,})...")
+        
+            done = demo.orders_completed
+            while done < num_orders_to_show:
+                stop = num_orders_to_show if progress is None else min(
+                    (done // progress_every + 1) * progress_every, num_orders_to_show)
+                for order in itertools.islice(order_stream, stop - done):
+                    assemble_order(demo, processed_cache, process, ledger, fetch, order)
+                if demo.orders_completed < stop:
+                    break  # The order stream ran dry
+                done = stop
+                if progress is not None:
+                    progress(done, num_orders_to_show)
+        
+            if ledger is not None:
+                if ledger.flush():
+                    demo.storage_trips += 1
+                    demo.meter.record_query(latency_s=ledger.last_flush_s)
+                record_stock_stats(demo, ledger)
     
-    # Calculate ultra-efficient batching cost
-    batch_cost = demo.cost_per_db_query_zar + (500 * demo.cost_per_cpu_op_zar)
-    demo.total_cost_zar += batch_cost
-    print(f"   💰 Total batching cost: R{batch_cost:.6f} (SINGLE query for ALL ingredients!)")
+        demo.elapsed_s = time.perf_counter() - start_time
+        record_pool_stats(demo, get_pool(DB_PATH))
+        record_cache_stats(demo, processed_cache)
+    finally:
+        processed_cache.unwatch()
     
-    # Store batch cost for later calculation
-    demo.batch_cost = batch_cost
+    if verbose:
+        print_results(demo, storage, ledger, precomputed if precompute else None)
+    return demo
 
-    print(f"\n🍕 PHASE 2: Processing {num_orders_to_show:,} pizzas (ZERO additional DB calls!)")
-    
-    # OPTIMIZATION 4: Pre-calculate pepperoni portions
-    pepperoni_portions = processed_cache['pepperoni'][:num_orders_to_show]
-    
-    for order in range(num_orders_to_show):
-        order_cost_start = demo.total_cost_zar
-        
-        # OPTIMIZATION 5: Use cached data - NO database calls!
-        # All ingredients come from cache - zero I/O cost!
-        
-        # Minimal CPU for assembly (no DB overhead)
-        demo.cpu_operations += 2  # Ultra-minimal assembly work
-        assembly_cost = 2 * demo.cost_per_cpu_op_zar
-        demo.total_cost_zar += assembly_cost
-        
-        demo.orders_completed += 1
-        
-        order_total_cost = demo.total_cost_zar - order_cost_start
-        if order < 5:
-            print(f"   🍕 Pizza #{order + 1}: R{order_total_cost:.6f} (ZERO DB queries - pure cache!)")
-        elif order == 5:
-            print("   ⚡ Processing remaining pizzas from cache (progress updates every 10,000)...")
-        elif (order + 1) % 10000 == 0:  # Progress updates every 10,000 pizzas
-            print(f"   📈 Progress: {order + 1:,} pizzas completed from cache...")
-        
+def print_progress(done, total):
+    print(f"   📈 Progress: {done:,} pizzas completed from cache...")
 
-    
+def print_results(demo, storage=None, ledger=None, precomputed=None):
     cost_per_order = demo.total_cost_zar / demo.orders_completed
+    warm_label = f"{precomputed.queries} warm-start queries" if precomputed is not None else "1 mega-query"
     
     print("\n" + "="*50)
     print("⚡ OPTIMIZED KITCHEN RESULTS")
     print("="*50)
     print(f"🍕 Total Pizzas Processed: {demo.orders_completed:,}")
-    print(f"🔄 Total DB Queries: {demo.storage_trips:,} (1 mega-query for all ingredients)")
+    if not demo.cache_misses and not demo.stock_flushes:
+        print(f"🔄 Total DB Queries: {demo.storage_trips:,} ({warm_label} for all ingredients)")
+    else:
+        print(f"🔄 Total DB Queries: {demo.storage_trips:,} ({warm_label} + {demo.cache_misses:,} cache refills + {demo.stock_flushes:,} stock writes)")
     print(f"💰 Cost per Pizza: R{cost_per_order:.6f}")
-    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.2f}")
+    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.4f}")
+    print_measured_usage(demo.meter)
+    print(f"⏱️  Wall-clock Time: {demo.elapsed_s:.2f}s ({demo.elapsed_s / demo.orders_completed * 1000:.3f} ms per pizza)")
+    print(f"🗄️  Ingredient Cache: {demo.cache_hits:,} hits / {demo.cache_misses:,} misses / {demo.cache_evictions:,} evictions")
+    print(f"🔌 Connection Pool: {demo.pool_hits:,} reused / {demo.pool_misses:,} opened, {demo.pool_wait_time_s * 1000:.1f} ms waiting")
+    if storage is not None:
+        latency_ms = storage.percentiles()
+        print(f"🌐 Simulated Query Latency: p50 {latency_ms[50]:.2f} ms / p99 {latency_ms[99]:.2f} ms over {storage.queries:,} queries")
+    if ledger is not None:
+        write_rate = demo.stock_rows_written / demo.stock_write_time_s if demo.stock_write_time_s else 0
+        print(f"📦 Stock Writes: {demo.stock_rows_written:,} rows in {demo.stock_flushes:,} transactions "
+              f"({write_rate:,.0f} rows/s, {demo.stock_lock_wait_s * 1000:.1f} ms lock wait, {demo.stock_lock_retries} retries)")
     
     print(f"\n✨ GCP OPTIMIZATION BENEFITS:")
     print(f"   🟢 Query Reduction: 99.998% fewer Cloud SQL calls")
@@ -163,8 +392,6 @@ def optimised_kitchen_demo(num_orders_to_show):
     print(f"   🌐 Minimal VPC network usage")
     print(f"   ⚡ Ultra-fast Cloud Functions execution")
 
-    return demo
-
 if __name__ == "__main__":
     # Demo with Debonairs volume
     print("Running demo with 80,000 pizzas (Debonairs daily volume)\n")
@@ -174,16 +401,17 @@ if __name__ == "__main__":
     print("📈 OPTIMIZATION IMPACT - DEBONAIRS PIZZA SA")
     print("="*70)
     
-    # Compare with actual chaotic approach costs
-    chaotic_daily_cost = 58.82  # From dough_re_mi.py actual output
-    chaotic_daily_orders = 80_000
-    chaotic_cost_per_order = chaotic_daily_cost / chaotic_daily_orders  # R0.000735
+    # Compare with the chaotic approach, measured in the same run on the same machine
+    import dough_re_mi
+    print("⏳ Measuring a 15,000-pizza chaotic baseline run for comparison...")
+    chaotic = dough_re_mi.chaotic_kitchen_demo(15000, verbose=False)
+    chaotic_cost_per_order = chaotic.total_cost_zar / chaotic.orders_completed
     
     ultra_optimized_cost_per_order = demo.total_cost_zar / demo.orders_completed
     
-    # Account for the fact that batching cost is amortized across all orders
-    amortized_batch_cost = demo.batch_cost / demo.orders_completed
-    effective_cost_per_order = amortized_batch_cost + (2 * demo.cost_per_cpu_op_zar)
+    # Batching cost is paid once and amortized across all orders
+    amortized_batch_cost = demo.meter.total_cost_zar('batch') / demo.orders_completed
+    effective_cost_per_order = amortized_batch_cost + demo.meter.total_cost_zar('assembly') / demo.orders_completed
     
     savings_per_order = chaotic_cost_per_order - effective_cost_per_order
     savings_percentage = (savings_per_order / chaotic_cost_per_order) * 100
@@ -192,6 +420,7 @@ if __name__ == "__main__":
     debonairs_daily = demo.orders_completed  # Actual volume processed
     scaled_cost = demo.total_cost_zar  # Actual cost from demo
     scaled_queries = demo.storage_trips  # Actual queries from demo
+    chaotic_queries = chaotic.storage_trips / chaotic.orders_completed * debonairs_daily
     
     print(f"🏢 Debonairs Daily Volume: {debonairs_daily:,} pizzas")
     print(f"🔄 Daily GCP Cloud SQL Queries: {scaled_queries:,.0f}")
@@ -201,7 +430,8 @@ if __name__ == "__main__":
     print(f"\n🏆 OPTIMIZATION SUCCESS:")
     print(f"   Cost per Pizza: R{ultra_optimized_cost_per_order:.6f} (vs R{chaotic_cost_per_order:.6f} chaotic)")
     print(f"   Savings: {savings_percentage:.1f}% cost reduction per pizza")
-    print(f"   Query Efficiency: 1 query vs 320,000 queries (99.9997% reduction)")
+    print(f"   Query Efficiency: {scaled_queries:,} queries vs {chaotic_queries:,.0f} queries "
+          f"({(1 - scaled_queries / chaotic_queries) * 100:.4f}% reduction)")
     
     print(f"\n🔥 KEY INSIGHT:")
     print(f"   Smart algorithms = Massive cost savings in South Africa!")
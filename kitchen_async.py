@@ -0,0 +1,146 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kitchen_pool import get_pool, record_pool_stats
+from kitchen_schema import PIZZA_INGREDIENTS
+from kitchen_numpy import get_processor
+from kitchen_latency import as_latency_model
+from kitchen_costs import estimate_bytes, print_measured_usage
+from dough_re_mi import KitchenDemo, DB_PATH, setup_database, fetch_ingredient_data, process_ingredient_data
+
+class ExecutorFetcher:
+    """Runs the blocking SQLite fetch on a bounded thread pool so awaits can overlap"""
+    def __init__(self, executor, fetch=fetch_ingredient_data):
+        self.executor = executor
+        self.fetch = fetch
+
+    async def fetch_ingredient_data(self, ingredient_name):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.fetch, ingredient_name)
+
+class AsyncLatencyStore:
+    """
+    Local async stand-in for Cloud SQL.
+    Serves ingredient rows from memory after an injectable round-trip delay
+    (seconds, or a kitchen_latency.LatencyModel for jitter), so overlapping
+    fetches behave like real network-bound queries.
+    """
+    def __init__(self, rows_by_name, latency_s=0.002):
+        self.rows_by_name = rows_by_name
+        self.latency = as_latency_model(latency_s)
+
+    @classmethod
+    def from_database(cls, db_path=DB_PATH, latency_s=0.002, window=250):
+        rows_by_name = {}
+        with get_pool(db_path).connection() as conn:
+            for name, qty, cost in conn.execute('SELECT name, quantity, cost FROM ingredients ORDER BY id'):
+                rows = rows_by_name.setdefault(name, [])
+                if len(rows) < window:
+                    rows.append((qty, cost))
+        return cls(rows_by_name, latency_s)
+
+    async def fetch_ingredient_data(self, ingredient_name):
+        await asyncio.sleep(self.latency.sample_s())
+        data = self.rows_by_name.get(ingredient_name, [])
+        return data, len(data) + 100
+
+async def timed_fetch(demo, store, ingredient_name):
+    """Await one fetch and record it on the meter; overlapping waits are not double-billed"""
+    start = time.perf_counter()
+    data, cpu_ops = await store.fetch_ingredient_data(ingredient_name)
+    demo.meter.record_query(len(data), estimate_bytes(data), time.perf_counter() - start)
+    return data, cpu_ops
+
+async def make_pizza_async(demo, store, process=process_ingredient_data, recipe=PIZZA_INGREDIENTS):
+    """One order: all ingredient fetches in flight at once, then process each"""
+    results = await asyncio.gather(*(timed_fetch(demo, store, name) for name in recipe))
+    for data, cpu_ops in results:
+        demo.storage_trips += 1
+        demo.cpu_operations += cpu_ops
+        demo.memory_allocations += len(data) / 1000
+    for data, _ in results:
+        _, ops = process(data)
+        demo.cpu_operations += ops
+    demo.orders_completed += 1
+
+async def run_async_orders(demo, num_orders, store, process=process_ingredient_data, max_in_flight=64):
+    """Keep at most max_in_flight orders awaiting their ingredients at any moment"""
+    next_order = 0
+
+    async def order_worker():
+        nonlocal next_order
+        while next_order < num_orders:
+            next_order += 1
+            await make_pizza_async(demo, store, process)
+
+    await asyncio.gather(*(order_worker() for _ in range(min(max_in_flight, num_orders))))
+    return demo
+
+def async_kitchen_demo(num_orders_to_show, max_in_flight=64, executor_workers=8, latency_s=None,
+                       processor='python', seed=None):
+    """
+    Chaotic kitchen's four fetches per pizza, overlapped with asyncio.
+    latency_s=None runs real SQLite queries on a bounded thread pool;
+    otherwise an in-memory store with that round-trip delay stands in for Cloud SQL.
+    """
+    demo = KitchenDemo()
+    process = process_ingredient_data if processor == 'python' else get_processor(processor, seed)
+    print("\n" + "="*70)
+    print("🍕 ASYNC KITCHEN - OVERLAPPING INGREDIENT ROUND TRIPS 🍕")
+    print("="*70)
+    print(f"🛫 In-flight orders: up to {max_in_flight:,}")
+
+    setup_database(seed=seed)
+    if latency_s is None:
+        print(f"🧵 SQLite fetches on {executor_workers} threads (pool of {executor_workers} connections)")
+        get_pool(DB_PATH, max_size=executor_workers)
+        executor = ThreadPoolExecutor(max_workers=executor_workers)
+        store = ExecutorFetcher(executor)
+    else:
+        print(f"🌐 Simulated Cloud SQL round trip: {as_latency_model(latency_s).rtt_ms:.1f} ms")
+        executor = None
+        store = AsyncLatencyStore.from_database(latency_s=latency_s)
+    print("="*70)
+
+    start_time = time.perf_counter()
+    try:
+        with demo.meter.phase('orders'):
+            asyncio.run(run_async_orders(demo, num_orders_to_show, store, process, max_in_flight))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    demo.elapsed_s = time.perf_counter() - start_time
+    record_pool_stats(demo, get_pool(DB_PATH))
+
+    print(f"\n🍕 Total Pizzas Processed: {demo.orders_completed:,}")
+    print(f"🔄 Total DB Queries: {demo.storage_trips:,} (still 4 per pizza - but overlapped)")
+    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.4f}")
+    print_measured_usage(demo.meter)
+    print(f"⏱️  Wall-clock Time: {demo.elapsed_s:.2f}s ({demo.orders_completed / demo.elapsed_s:,.0f} pizzas/s)")
+    print(f"🔌 Connection Pool: {demo.pool_hits:,} reused / {demo.pool_misses:,} opened, {demo.pool_wait_time_s * 1000:.1f} ms waiting")
+    return demo
+
+def in_flight_sweep(num_orders, limits=(1, 4, 16, 64, 256), latency_s=0.002):
+    """Return (max_in_flight, elapsed_s, pizzas_per_second) rows against the simulated store"""
+    setup_database()
+    store = AsyncLatencyStore.from_database(latency_s=latency_s)
+    results = []
+    for limit in limits:
+        demo = KitchenDemo()
+        start_time = time.perf_counter()
+        asyncio.run(run_async_orders(demo, num_orders, store, max_in_flight=limit))
+        elapsed = time.perf_counter() - start_time
+        results.append((limit, elapsed, num_orders / elapsed))
+    return results
+
+if __name__ == "__main__":
+    async_kitchen_demo(5_000, latency_s=0.002)
+
+    print("\n" + "="*70)
+    print("📈 THROUGHPUT VS IN-FLIGHT LIMIT (2,000 pizzas, 2 ms round trips)")
+    print("="*70)
+    print(f"{'In-flight':>10} {'Time (s)':>10} {'Pizzas/s':>12}")
+    for limit, elapsed, throughput in in_flight_sweep(2_000):
+        print(f"{limit:>10,} {elapsed:>10.2f} {throughput:>12,.0f}")
+    print("="*70)
@@ -0,0 +1,131 @@
+import itertools
+import time
+
+from kitchen_pool import get_pool, record_pool_stats
+from kitchen_schema import PIZZA_INGREDIENTS
+from kitchen_costs import print_measured_usage
+from fresh_pizza_of_belair import KitchenDemo, DB_PATH, setup_database, process_ingredient_data
+
+def iter_order_batches(num_orders, batch_size, recipe=PIZZA_INGREDIENTS):
+    """Yield lists of orders (ingredient-name tuples), batch_size at a time"""
+    for start in range(0, num_orders, batch_size):
+        yield [recipe] * min(batch_size, num_orders - start)
+
+def iter_stream_batches(orders, batch_size):
+    """Yield lists of up to batch_size orders from any order stream (e.g. kitchen_workload)"""
+    iterator = iter(orders)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+# SQLite's default cap on SELECTs in one compound statement
+MAX_UNION_BRANCHES = 500
+
+def _window_query(count):
+    # One index SEARCH per name that stops after `window` rows, however large the table
+    branch = 'SELECT * FROM (SELECT name, quantity, cost FROM ingredients WHERE name = ? ORDER BY id LIMIT ?)'
+    return ' UNION ALL '.join([branch] * count)
+
+def fetch_ingredients_for_orders(orders, window=250, db_path=DB_PATH):
+    """
+    Fetch ingredients for a whole batch of orders in ONE query (one per
+    MAX_UNION_BRANCHES distinct names). A UNION ALL of per-name LIMIT
+    branches over the names the batch needs, so each name costs an index
+    search capped at `window` rows and memory is bounded by the batch's
+    menu rather than by the size of the ingredients table.
+    Returns (rows grouped by name, cpu_ops, queries executed).
+    """
+    names = sorted({name for order in orders for name in order})
+    rows = []
+    queries = 0
+    with get_pool(db_path).connection() as conn:
+        for start in range(0, len(names), MAX_UNION_BRANCHES):
+            chunk = names[start:start + MAX_UNION_BRANCHES]
+            params = [value for name in chunk for value in (name, window)]
+            rows.extend(conn.execute(_window_query(len(chunk)), params).fetchall())
+            queries += 1
+
+    grouped = {name: [] for name in names}
+    for name, qty, cost in rows:
+        grouped[name].append((qty, cost))
+    return grouped, len(rows) + 100, queries
+
+def run_batched_orders(demo, num_orders, batch_size, window=250, storage=None, orders=None):
+    """Process num_orders in batches, one DB query per batch (orders: optional stream to replay)"""
+    fetch = storage.wrap(fetch_ingredients_for_orders) if storage is not None else fetch_ingredients_for_orders
+    if orders is None:
+        batches = iter_order_batches(num_orders, batch_size)
+    else:
+        batches = iter_stream_batches(itertools.islice(orders, num_orders), batch_size)
+    for batch in batches:
+        # One round trip for the whole batch (more only past MAX_UNION_BRANCHES names)
+        batch_data, cpu_ops, queries = demo.meter.query(fetch, batch, window)
+        demo.storage_trips += queries
+        demo.cpu_operations += cpu_ops
+        rows_fetched = sum(len(data) for data in batch_data.values())
+        demo.memory_allocations += rows_fetched / 1000
+
+        # Process each ingredient once per batch, then share it across the batch
+        processed = {}
+        for name, data in batch_data.items():
+            processed[name], ops = process_ingredient_data(data)
+            demo.cpu_operations += ops
+
+        for order in batch:
+            demo.cpu_operations += len(order)  # Assemble from the batch
+            demo.orders_completed += 1
+    return demo
+
+def batched_kitchen_demo(num_orders_to_show, batch_size=1000, window=250):
+    demo = KitchenDemo()
+    print("\n" + "="*70)
+    print("🍕 BATCHED KITCHEN - MIDDLE GROUND BETWEEN N+4 AND MEGA-QUERY 🍕")
+    print("="*70)
+    print(f"📦 Batch size: {batch_size:,} orders per query")
+    print(f"🪟 Window: {window:,} rows per ingredient per batch")
+    print("="*70)
+
+    setup_database()
+    start_time = time.perf_counter()
+    with demo.meter.phase('orders'):
+        run_batched_orders(demo, num_orders_to_show, batch_size, window)
+    demo.elapsed_s = time.perf_counter() - start_time
+    record_pool_stats(demo, get_pool(DB_PATH))
+
+    print(f"\n🍕 Total Pizzas Processed: {demo.orders_completed:,}")
+    print(f"🔄 Total DB Queries: {demo.storage_trips:,} ({demo.storage_trips / demo.orders_completed:.4f} per pizza)")
+    print(f"💰 Cost per Pizza: R{demo.total_cost_zar / demo.orders_completed:.6f}")
+    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.4f}")
+    print_measured_usage(demo.meter)
+    print(f"⏱️  Throughput: {demo.orders_completed / demo.elapsed_s:,.0f} pizzas/s")
+    return demo
+
+def batch_size_sweep(num_orders, batch_sizes=(10, 100, 1000, 10000), window=250, rows_per_ingredient=250):
+    """Return (batch_size, queries, queries_per_order, pizzas_per_second, total_cost_zar) rows"""
+    setup_database(rows_per_ingredient=rows_per_ingredient)
+    results = []
+    for batch_size in batch_sizes:
+        demo = KitchenDemo()
+        start_time = time.perf_counter()
+        with demo.meter.phase('orders'):
+            run_batched_orders(demo, num_orders, batch_size, window)
+        elapsed = time.perf_counter() - start_time
+        results.append((batch_size, demo.storage_trips, demo.storage_trips / num_orders,
+                        num_orders / elapsed, demo.total_cost_zar))
+    return results
+
+if __name__ == "__main__":
+    # A full Debonairs day, processed in bounded-memory chunks
+    batched_kitchen_demo(80_000, batch_size=1000)
+
+    # The per-name windows keep each query's cost flat as the table grows
+    for rows_per_ingredient in (250, 250_000):
+        print("\n" + "="*70)
+        print(f"📈 THROUGHPUT PER BATCH SIZE (80,000 pizzas, {rows_per_ingredient * len(PIZZA_INGREDIENTS):,} rows)")
+        print("="*70)
+        print(f"{'Batch':>8} {'Queries':>10} {'Q/pizza':>10} {'Pizzas/s':>12} {'Cost (R)':>10}")
+        for batch_size, queries, ratio, throughput, cost in batch_size_sweep(80_000, rows_per_ingredient=rows_per_ingredient):
+            print(f"{batch_size:>8,} {queries:>10,} {ratio:>10.4f} {throughput:>12,.0f} {cost:>10.6f}")
+        print("="*70)
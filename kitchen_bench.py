@@ -0,0 +1,285 @@
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import dough_re_mi
+import fresh_pizza_of_belair
+from kitchen_latency import percentile
+from kitchen_schema import PIZZA_INGREDIENTS
+
+# Default grid: every kitchen case runs over orders x rows, every file case over file sizes
+BENCH_GRID = {
+    'orders': (1_000, 5_000),
+    'rows_per_ingredient': (250, 2_500),
+    'file_mb': (10, 50),
+}
+QUICK_GRID = {
+    'orders': (200,),
+    'rows_per_ingredient': (250,),
+    'file_mb': (2,),
+}
+
+def _run_chaotic(orders, rows_per_ingredient, seed, verbose=False):
+    # A replayed stream of the default pizza, so every order's service time is recorded
+    demo = dough_re_mi.chaotic_kitchen_demo(orders, rows_per_ingredient=rows_per_ingredient, seed=seed,
+                                            verbose=verbose, orders=itertools.repeat(PIZZA_INGREDIENTS, orders))
+    return demo.orders_completed, demo.elapsed_s, demo.order_service_s
+
+def _run_optimised(orders, rows_per_ingredient, seed, verbose=False):
+    demo = fresh_pizza_of_belair.optimised_kitchen_demo(orders, rows_per_ingredient=rows_per_ingredient, seed=seed,
+                                                        verbose=verbose,
+                                                        orders=itertools.repeat(PIZZA_INGREDIENTS, orders))
+    return demo.orders_completed, demo.elapsed_s, demo.order_service_s
+
+def _file_runner(processor_name):
+    def run(path, verbose=False):
+        # memory_demo needs psutil - only import it when a file case actually runs
+        import memory_demo
+        start = time.perf_counter()
+        with _quiet(not verbose):
+            lines, _ = getattr(memory_demo, processor_name)(path)
+        return lines, time.perf_counter() - start, None
+    return run
+
+# name -> (grid axes, runner); a runner returns (items processed, timed seconds,
+# per-item latencies in seconds or None)
+CASES = {
+    'chaotic': (('orders', 'rows_per_ingredient'), _run_chaotic),
+    'optimised': (('orders', 'rows_per_ingredient'), _run_optimised),
+    'readlines': (('file_mb',), _file_runner('inefficient_file_processing')),
+    'streaming': (('file_mb',), _file_runner('efficient_file_processing')),
+    'pipeline': (('file_mb',), _file_runner('pipeline_file_processing')),
+    'parallel_scan': (('file_mb',), _file_runner('parallel_file_processing')),
+}
+
+class BenchCase:
+    """One point in the grid: a case name plus its parameters"""
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+
+    @property
+    def key(self):
+        return self.name + ''.join(f" {axis}={value}" for axis, value in sorted(self.params.items()))
+
+def expand_grid(case_names=None, grid=BENCH_GRID):
+    """Cross every case with the grid axes it uses"""
+    cases = []
+    for name in case_names or CASES:
+        axes, _ = CASES[name]
+        for values in itertools.product(*(grid[axis] for axis in axes)):
+            cases.append(BenchCase(name, dict(zip(axes, values))))
+    return cases
+
+@contextlib.contextmanager
+def _quiet(enabled=True):
+    # memory_demo reports with print(); keep that out of the benchmark's own output
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+class SampleFiles:
+    """Create each sample log size once per benchmark run and clean up afterwards"""
+    def __init__(self, directory=None):
+        self.directory = directory or tempfile.mkdtemp(prefix='kitchen_bench_')
+        self._paths = {}
+
+    def path(self, size_mb):
+        path = self._paths.get(size_mb)
+        if path is None:
+            import memory_demo
+            path = os.path.join(self.directory, f'sample_{size_mb}mb.log')
+            with _quiet():
+                memory_demo.create_sample_file(path, size_mb=size_mb)
+            self._paths[size_mb] = path
+        return path
+
+    def cleanup(self):
+        for path in self._paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._paths.clear()
+        if os.path.isdir(self.directory) and not os.listdir(self.directory):
+            os.rmdir(self.directory)
+
+def run_case(case, files, warmup=1, repetitions=5, seed=42, trace_memory=True, quiet=True):
+    """
+    Warm up, then time `repetitions` runs with the same seed.
+    Throughput is items per timed second (pizzas or log lines); latency
+    percentiles are per order, pooled over the timed runs (kitchen cases
+    only); peak memory comes from one extra tracemalloc run that is never timed.
+    """
+    _, runner = CASES[case.name]
+    if 'file_mb' in case.params:
+        args = (files.path(case.params['file_mb']),)
+    else:
+        args = (case.params['orders'], case.params['rows_per_ingredient'], seed)
+
+    def run_once():
+        random.seed(seed)
+        return runner(*args, verbose=not quiet)
+
+    for _ in range(warmup):
+        run_once()
+
+    times = []
+    latencies_ms = []
+    items = 0
+    for _ in range(repetitions):
+        items, elapsed, latencies_s = run_once()
+        times.append(elapsed)
+        if latencies_s is not None:
+            latencies_ms.extend(seconds * 1000 for seconds in latencies_s)
+
+    peak_traced_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            run_once()
+            peak_traced_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    median_s = statistics.median(times)
+    return {
+        'case': case.name,
+        'key': case.key,
+        **case.params,
+        'seed': seed,
+        'repetitions': repetitions,
+        'items': items,
+        'median_s': median_s,
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'latency_p50_ms': percentile(latencies_ms, 50) if latencies_ms else None,
+        'latency_p90_ms': percentile(latencies_ms, 90) if latencies_ms else None,
+        'latency_p99_ms': percentile(latencies_ms, 99) if latencies_ms else None,
+        'throughput_per_s': items / median_s if median_s else 0.0,
+        'ms_per_item': median_s / items * 1000 if items else 0.0,
+        'peak_traced_mb': peak_traced_mb,
+    }
+
+def run_benchmarks(case_names=None, grid=BENCH_GRID, warmup=1, repetitions=5, seed=42, trace_memory=True,
+                   quiet=True):
+    """Run every grid point; returns {'machine': ..., 'results': [row, ...]}"""
+    files = SampleFiles()
+    results = []
+    try:
+        for case in expand_grid(case_names, grid):
+            print(f"⏱️  {case.key} ...", flush=True)
+            row = run_case(case, files, warmup, repetitions, seed, trace_memory, quiet)
+            line = f"   {row['throughput_per_s']:>14,.0f} items/s   median run {row['median_s'] * 1000:9.1f} ms"
+            if row['latency_p99_ms'] is not None:
+                line += f"   order p50 {row['latency_p50_ms']:.3f} ms / p99 {row['latency_p99_ms']:.3f} ms"
+            print(line)
+            results.append(row)
+    finally:
+        files.cleanup()
+    return {'machine': machine_info(), 'results': results}
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def write_json(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def write_csv(report, path):
+    rows = report['results']
+    fieldnames = []
+    for row in rows:
+        for field in row:
+            if field not in fieldnames:
+                fieldnames.append(field)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare_to_baseline(report, baseline, tolerance=0.10):
+    """
+    Match grid points by key and flag regressions beyond `tolerance`:
+    lower throughput, or higher traced peak memory.
+    Returns a list of (key, metric, baseline_value, current_value, change) tuples.
+    """
+    previous = {row['key']: row for row in baseline['results']}
+    regressions = []
+    for row in report['results']:
+        old = previous.get(row['key'])
+        if old is None:
+            continue
+        if old['throughput_per_s'] and row['throughput_per_s'] < old['throughput_per_s'] * (1 - tolerance):
+            change = row['throughput_per_s'] / old['throughput_per_s'] - 1
+            regressions.append((row['key'], 'throughput_per_s', old['throughput_per_s'], row['throughput_per_s'], change))
+        if old.get('peak_traced_mb') and row.get('peak_traced_mb') is not None and \
+                row['peak_traced_mb'] > old['peak_traced_mb'] * (1 + tolerance):
+            change = row['peak_traced_mb'] / old['peak_traced_mb'] - 1
+            regressions.append((row['key'], 'peak_traced_mb', old['peak_traced_mb'], row['peak_traced_mb'], change))
+    return regressions
+
+def print_report(report):
+    print("\n" + "="*102)
+    print("📊 BENCHMARK RESULTS")
+    print("="*102)
+    print(f"{'Case':<44} {'Items/s':>12} {'Run (ms)':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Peak (MB)':>10}")
+    nan = float('nan')
+    for row in report['results']:
+        peak = row['peak_traced_mb']
+        p50, p99 = row['latency_p50_ms'], row['latency_p99_ms']
+        print(f"{row['key']:<44} {row['throughput_per_s']:>12,.0f} {row['median_s'] * 1000:>10.1f} "
+              f"{p50 if p50 is not None else nan:>10.3f} {p99 if p99 is not None else nan:>10.3f} "
+              f"{peak if peak is not None else nan:>10.1f}")
+    print("p50/p99: per-order latency over every timed run (kitchen cases)")
+    print("="*102)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chaotic, optimised and streaming paths")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help="Cases to run (default: all)")
+    parser.add_argument('--quick', action='store_true', help="Tiny grid for a smoke run")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-trace-memory', action='store_true', help="Skip the tracemalloc peak-memory run")
+    parser.add_argument('--json', help="Write results as JSON to this path")
+    parser.add_argument('--csv', help="Write results as CSV to this path")
+    parser.add_argument('--baseline', help="Compare against a JSON report from an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.cases, QUICK_GRID if args.quick else BENCH_GRID, args.warmup,
+                            args.repetitions, args.seed, not args.no_trace_memory)
+    print_report(report)
+    if args.json:
+        write_json(report, args.json)
+        print(f"💾 JSON written to {args.json}")
+    if args.csv:
+        write_csv(report, args.csv)
+        print(f"💾 CSV written to {args.csv}")
+    if args.baseline:
+        regressions = compare_to_baseline(report, load_report(args.baseline), args.tolerance)
+        if regressions:
+            print(f"\n🚨 {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for key, metric, old, new, change in regressions:
+                print(f"   {key}: {metric} {old:,.2f} -> {new:,.2f} ({change:+.1%})")
+            raise SystemExit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Callbacks run whenever ingredient rows are written: callback(db_path, names)
+_invalidation_hooks = []
+_hooks_lock = threading.Lock()
+
+def register_invalidation_hook(callback):
+    with _hooks_lock:
+        _invalidation_hooks.append(callback)
+
+def unregister_invalidation_hook(callback):
+    with _hooks_lock:
+        if callback in _invalidation_hooks:
+            _invalidation_hooks.remove(callback)
+
+def notify_ingredients_changed(db_path, names=None):
+    """Tell every watching cache that names (or everything, if None) changed in db_path"""
+    with _hooks_lock:
+        hooks = list(_invalidation_hooks)
+    for callback in hooks:
+        callback(db_path, names)
+
+class IngredientCache:
+    """
+    Size-bounded LRU cache keyed by ingredient name, with optional TTL.
+    Call watch(db_path) to drop entries automatically when that database's
+    ingredients are written, so a hit always means the data is fresh.
+    """
+    def __init__(self, max_entries=128, ttl_s=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries = OrderedDict()  # name -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._watching = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, stored_at):
+        return self.ttl_s is None or self.clock() - stored_at < self.ttl_s
+
+    def get(self, name, default=None):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                if self._is_fresh(entry[0]):
+                    self._entries.move_to_end(name)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[name]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, name, value):
+        with self._lock:
+            self._entries[name] = (self.clock(), value)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, names=None):
+        """Drop the given names, or every entry when names is None"""
+        with self._lock:
+            if names is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for name in names:
+                if self._entries.pop(name, None) is not None:
+                    self.invalidations += 1
+
+    def __contains__(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry is not None and self._is_fresh(entry[0])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _on_ingredients_changed(self, db_path, names):
+        if db_path == self._watching:
+            self.invalidate(names)
+
+    def watch(self, db_path):
+        """Invalidate entries whenever ingredients in db_path are written"""
+        self.unwatch()
+        self._watching = db_path
+        register_invalidation_hook(self._on_ingredients_changed)
+
+    def unwatch(self):
+        if self._watching is not None:
+            unregister_invalidation_hook(self._on_ingredients_changed)
+            self._watching = None
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+def record_cache_stats(demo, cache):
+    """Copy cache counters onto a KitchenDemo"""
+    demo.cache_hits = cache.hits
+    demo.cache_misses = cache.misses
+    demo.cache_evictions = cache.evictions
+    demo.cache_expirations = cache.expirations
+    demo.cache_invalidations = cache.invalidations
@@ -0,0 +1,283 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from kitchen_trace import span
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# GCP on-demand pricing (us-central1), USD
+GCP_PRICING_USD = {
+    'vcpu_second': 0.031611 / 3600,   # n1 vCPU-hour
+    'gb_second': 0.004237 / 3600,     # n1 memory GB-hour
+    'query': 0.000006,                # Cloud SQL cost per query
+    'egress_gb': 0.12,                # VPC / internet egress per GB
+}
+ZAR_PER_USD = 17.00
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except (ImportError, AttributeError):
+        return 0.0
+
+def current_rss_mb():
+    """Resident set size of this process right now, in MB (the high-water mark if unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        return peak_rss_mb()
+
+class RSSSampler:
+    """
+    Samples this process's RSS on a background thread so short-lived peaks
+    are not missed between the start and end readings. The thread costs CPU
+    and GIL time of its own, so CostMeter only runs one when asked to.
+    """
+    def __init__(self, interval_s=0.005):
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = None
+        self.baseline_mb = 0.0
+        self.peak_mb = 0.0
+        self.end_mb = 0.0
+        self.samples = 0
+
+    def _rss_mb(self):
+        return current_rss_mb()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def _sample(self):
+        rss = self._rss_mb()
+        self.samples += 1
+        if rss > self.peak_mb:
+            self.peak_mb = rss
+
+    def start(self):
+        self.baseline_mb = self.peak_mb = self._rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='peak-rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.end_mb = self._rss_mb()
+        return self
+
+    @property
+    def peak_delta_mb(self):
+        return self.peak_mb - self.baseline_mb
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def estimate_bytes(data):
+    """Approximate wire size of fetched rows: 8 bytes per number, UTF-8 length per string"""
+    if isinstance(data, dict):
+        return sum(estimate_bytes(rows) for rows in data.values())
+    if not data:
+        return 0
+    first = data[0]
+    row_bytes = sum(len(value.encode()) if isinstance(value, str) else 8 for value in first)
+    return row_bytes * len(data)
+
+class PhaseUsage:
+    """Measured resource usage for one phase of a run"""
+    __slots__ = ('cpu_s', 'wall_s', 'peak_rss_mb', 'rss_growth_mb', 'memory_gb_s', 'queries', 'rows_fetched',
+                 'bytes_fetched', 'query_latency_s')
+    PEAKS = ('peak_rss_mb', 'rss_growth_mb')
+
+    def __init__(self):
+        self.cpu_s = 0.0            # time.process_time() spent in the phase
+        self.wall_s = 0.0           # Billed instance seconds (summed across workers)
+        self.peak_rss_mb = 0.0      # Highest RSS sampled while the phase ran
+        self.rss_growth_mb = 0.0    # That peak minus the RSS the phase started with
+        self.memory_gb_s = 0.0      # Phase peak RSS held for the phase's wall time
+        self.queries = 0
+        self.rows_fetched = 0
+        self.bytes_fetched = 0
+        self.query_latency_s = 0.0
+
+    def merge(self, other):
+        for name in self.__slots__:
+            if name in self.PEAKS:
+                setattr(self, name, max(getattr(self, name), getattr(other, name)))
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def copy(self):
+        return PhaseUsage().merge(self)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class CostMeter:
+    """
+    Derives cloud cost from what a run actually used: CPU time, wall time,
+    peak memory, queries, bytes fetched and query latency, per phase.
+    Wall time not spent on CPU is billed as idle instance time, so
+    overlapping round trips (async, batching) show up as real savings.
+    A phase's memory is its RSS at start and end; sample_rss=True also
+    polls it every sample_interval_s to catch peaks in between.
+    """
+    def __init__(self, pricing=GCP_PRICING_USD, zar_per_usd=ZAR_PER_USD, sample_rss=False, sample_interval_s=0.05):
+        self.pricing = pricing
+        self.zar_per_usd = zar_per_usd
+        self.sample_rss = sample_rss
+        self.sample_interval_s = sample_interval_s
+        self.phases = {}
+        self._open = None  # (usage, cpu_start, wall_start, rss_start, sampler)
+
+    def _phase_usage(self, name):
+        usage = self.phases.get(name)
+        if usage is None:
+            usage = self.phases[name] = PhaseUsage()
+        return usage
+
+    @contextmanager
+    def phase(self, name):
+        if self._open is not None:
+            raise RuntimeError(f"Cannot start phase '{name}' while another phase is running")
+        usage = self._phase_usage(name)
+        # Memory is sampled per phase: the process high-water mark would charge
+        # this phase for whatever ran before it
+        rss_start = current_rss_mb()
+        sampler = RSSSampler(self.sample_interval_s).start() if self.sample_rss else None
+        self._open = (usage, time.process_time(), time.perf_counter(), rss_start, sampler)
+        try:
+            with span(f'phase.{name}'):
+                yield usage
+        finally:
+            self._close_open()
+            self._open = None
+
+    def _open_peak_mb(self, stop=False):
+        _, _, _, rss_start, sampler = self._open
+        if sampler is None:
+            return max(rss_start, current_rss_mb())
+        if stop:
+            sampler.stop()
+            return max(rss_start, sampler.peak_mb)
+        return max(rss_start, sampler.peak_mb, current_rss_mb())
+
+    def _close_open(self):
+        usage, cpu_start, wall_start, rss_start, _ = self._open
+        wall_s = time.perf_counter() - wall_start
+        rss_mb = self._open_peak_mb(stop=True)
+        usage.cpu_s += time.process_time() - cpu_start
+        usage.wall_s += wall_s
+        usage.peak_rss_mb = max(usage.peak_rss_mb, rss_mb)
+        usage.rss_growth_mb = max(usage.rss_growth_mb, rss_mb - rss_start)
+        usage.memory_gb_s += rss_mb / 1024 * wall_s
+
+    def record_query(self, rows=0, bytes_fetched=0, latency_s=0.0, queries=1):
+        usage = self._open[0] if self._open is not None else self._phase_usage('unphased')
+        usage.queries += queries
+        usage.rows_fetched += rows
+        usage.bytes_fetched += bytes_fetched
+        usage.query_latency_s += latency_s
+
+    def query(self, fetch, *args):
+        """
+        Call a kitchen fetch function, recording its rows, bytes and latency.
+        A fetch that returns (data, cpu_ops, queries) is counted as that many queries.
+        """
+        start = time.perf_counter()
+        result = fetch(*args)
+        latency_s = time.perf_counter() - start
+        data = result[0]
+        rows = sum(len(v) for v in data.values()) if isinstance(data, dict) else len(data)
+        self.record_query(rows, estimate_bytes(data), latency_s, queries=result[2] if len(result) > 2 else 1)
+        return result
+
+    def usage(self, name=None):
+        """Usage for one phase (or all phases), including the phase still running"""
+        names = [name] if name is not None else list(self.phases)
+        total = PhaseUsage()
+        for phase_name in names:
+            usage = self.phases.get(phase_name)
+            if usage is None:
+                continue
+            usage = usage.copy()
+            if self._open is not None and self._open[0] is self.phases[phase_name]:
+                _, cpu_start, wall_start, rss_start, _ = self._open
+                wall_s = time.perf_counter() - wall_start
+                rss_mb = self._open_peak_mb()
+                usage.cpu_s += time.process_time() - cpu_start
+                usage.wall_s += wall_s
+                usage.peak_rss_mb = max(usage.peak_rss_mb, rss_mb)
+                usage.rss_growth_mb = max(usage.rss_growth_mb, rss_mb - rss_start)
+                usage.memory_gb_s += rss_mb / 1024 * wall_s
+            total.merge(usage)
+        return total
+
+    def cost_breakdown_zar(self, name=None):
+        usage = self.usage(name)
+        price = self.pricing
+        breakdown = {
+            'cpu': usage.cpu_s * price['vcpu_second'],
+            'idle': max(usage.wall_s - usage.cpu_s, 0.0) * price['vcpu_second'],
+            'memory': usage.memory_gb_s * price['gb_second'],
+            'queries': usage.queries * price['query'],
+            'network': usage.bytes_fetched / 1024 ** 3 * price['egress_gb'],
+        }
+        breakdown = {item: usd * self.zar_per_usd for item, usd in breakdown.items()}
+        breakdown['total'] = sum(breakdown.values())
+        return breakdown
+
+    def total_cost_zar(self, name=None):
+        return self.cost_breakdown_zar(name)['total']
+
+    def to_dict(self):
+        return {
+            'cost_breakdown_zar': self.cost_breakdown_zar(),
+            'phases': {name: self.usage(name).to_dict() for name in self.phases},
+        }
+
+    def merge(self, other):
+        """Fold another meter's phases in (e.g. from a worker process)"""
+        for name, usage in other.phases.items():
+            self._phase_usage(name).merge(usage)
+        return self
+
+    def __getstate__(self):
+        # Open phases do not survive pickling to/from worker processes
+        state = self.__dict__.copy()
+        state['_open'] = None
+        return state
+
+def print_measured_usage(meter, name=None):
+    """Print what a run actually used and what each part of it cost"""
+    usage = meter.usage(name)
+    costs = meter.cost_breakdown_zar(name)
+    print(f"🧾 Measured: {usage.cpu_s:.2f}s CPU, {usage.peak_rss_mb:.0f} MB peak RSS, "
+          f"{usage.bytes_fetched / 1024 / 1024:.1f} MB fetched, {usage.query_latency_s:.2f}s summed query latency")
+    print(f"   CPU R{costs['cpu']:.4f} | Idle R{costs['idle']:.4f} | Memory R{costs['memory']:.4f} | "
+          f"Queries R{costs['queries']:.4f} | Network R{costs['network']:.4f}")
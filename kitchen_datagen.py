@@ -0,0 +1,223 @@
+import hashlib
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import time
+
+from kitchen_schema import PIZZA_INGREDIENTS, create_ingredients_database
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python generators produce the same shapes
+    np = None
+
+# Pre-built databases keyed on everything that shapes their contents
+FIXTURE_DIR = os.environ.get('KITCHEN_FIXTURE_DIR', '.kitchen_fixtures')
+
+LOG_START_TIMESTAMP = 1_700_000_000.0
+LOG_LINES_PER_SECOND = 100_000
+LOG_PAYLOAD = b'x' * 40
+LOG_CHUNK_LINES = 100_000
+
+def fast_ingredient_rows(rows_per_ingredient=250, names=PIZZA_INGREDIENTS, seed=None, chunk_size=50_000):
+    """
+    Yield (id, name, quantity, cost) rows, drawing each chunk's numbers in one
+    vectorised call. Reproducible for a given seed, though not the same
+    numbers as kitchen_schema.generate_ingredient_rows for that seed.
+    """
+    if np is None:
+        rng = random.Random(seed)
+        row_id = 1
+        for name in names:
+            for _ in range(rows_per_ingredient):
+                yield row_id, name, rng.randint(100, 500), rng.uniform(1.0, 5.0)
+                row_id += 1
+        return
+
+    rng = np.random.default_rng(seed)
+    row_id = 1
+    for name in names:
+        remaining = rows_per_ingredient
+        while remaining:
+            count = min(chunk_size, remaining)
+            quantities = rng.integers(100, 501, count).tolist()
+            costs = rng.uniform(1.0, 5.0, count).tolist()
+            yield from zip(range(row_id, row_id + count), itertools.repeat(name), quantities, costs)
+            row_id += count
+            remaining -= count
+
+# Parameters a database was built from, stored alongside the rows so a reused
+# file can be checked against what the caller is asking for
+BUILD_INFO_SCHEMA = 'CREATE TABLE IF NOT EXISTS build_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+
+def build_info(schema, rows_per_ingredient, names, seed):
+    """Everything that shapes a generated database's contents, as strings"""
+    return {
+        'schema': schema,
+        'rows_per_ingredient': str(rows_per_ingredient),
+        'names': ','.join(names),
+        'seed': '' if seed is None else str(seed),
+        'generator': 'numpy' if np is not None else 'python',
+    }
+
+def write_build_info(db_path, info):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(BUILD_INFO_SCHEMA)
+        conn.execute('DELETE FROM build_info')
+        conn.executemany('INSERT INTO build_info (key, value) VALUES (?, ?)', info.items())
+        conn.commit()
+    finally:
+        conn.close()
+
+def fixture_path(schema, rows_per_ingredient, names, seed, fixture_dir=None):
+    key = '|'.join(build_info(schema, rows_per_ingredient, names, seed).values())
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(fixture_dir or FIXTURE_DIR, f'ingredients_{schema}_{rows_per_ingredient}_{digest}.db')
+
+def build_ingredients_database(db_path, schema='indexed', rows_per_ingredient=250, names=PIZZA_INGREDIENTS,
+                               seed=None, fixtures=False, fixture_dir=None):
+    """
+    Create db_path with vectorised rows and bulk-load settings.
+    With fixtures=True (and a seed, so the contents are reproducible) the
+    database is built once into the fixture directory and copied on later
+    calls. The build parameters are recorded in a build_info table.
+    Returns 'fixture' when a copy was used, 'generated' otherwise.
+    """
+    info = build_info(schema, rows_per_ingredient, names, seed)
+    if not fixtures or seed is None:
+        create_ingredients_database(db_path, schema, rows_per_ingredient, names, seed,
+                                    rows=fast_ingredient_rows(rows_per_ingredient, names, seed))
+        write_build_info(db_path, info)
+        return 'generated'
+
+    fixture = fixture_path(schema, rows_per_ingredient, names, seed, fixture_dir)
+    source = 'fixture'
+    if not os.path.exists(fixture):
+        os.makedirs(os.path.dirname(fixture), exist_ok=True)
+        # Build under a temporary name so an interrupted build never looks like a fixture
+        building = f'{fixture}.{os.getpid()}.tmp'
+        create_ingredients_database(building, schema, rows_per_ingredient, names, seed,
+                                    rows=fast_ingredient_rows(rows_per_ingredient, names, seed))
+        os.replace(building, fixture)
+        source = 'generated'
+    shutil.copyfile(fixture, db_path)
+    write_build_info(db_path, info)
+    return source
+
+def _timestamps_us(rng, count, start_us, lines_per_second):
+    # Jittered gaps averaging 1 / lines_per_second, as integer microseconds
+    mean_gap_us = max(1_000_000 // lines_per_second, 1)
+    if np is not None:
+        gaps = rng.integers(0, 2 * mean_gap_us + 1, count, dtype=np.int64)
+        return start_us + np.cumsum(gaps)
+    timestamps = []
+    current = start_us
+    for _ in range(count):
+        current += rng.randint(0, 2 * mean_gap_us)
+        timestamps.append(current)
+    return timestamps
+
+def _format_lines_numpy(first, timestamps_us, payload):
+    # Every line in the chunk has the same width, so build them as one uint8 matrix
+    count = len(timestamps_us)
+    width = max(6, len(str(first + count - 1)))
+    seconds = timestamps_us // 1_000_000
+    if seconds[0] < 10 ** 9 or seconds[-1] >= 10 ** 10:
+        raise ValueError("Log timestamps must stay within 10-digit epoch seconds")
+    prefix = b'Sample log line '
+    middle = b' - timestamp: '
+    suffix = b' - data: ' + payload + b'\n'
+    template = prefix + b'0' * width + middle + b'0' * 10 + b'.' + b'0' * 6 + suffix
+    lines = np.tile(np.frombuffer(template, dtype=np.uint8), (count, 1))
+
+    def write_digits(column_end, values, digits):
+        for place in range(digits):
+            lines[:, column_end - place] = values // 10 ** place % 10 + ord('0')
+
+    numbers = np.arange(first, first + count, dtype=np.int64)
+    write_digits(len(prefix) + width - 1, numbers, width)
+    seconds_end = len(prefix) + width + len(middle) + 9
+    write_digits(seconds_end, seconds, 10)
+    write_digits(seconds_end + 7, timestamps_us % 1_000_000, 6)
+    return lines.tobytes()
+
+def _format_lines_python(first, timestamps_us, payload):
+    data = payload.decode()
+    return ''.join(
+        f"Sample log line {number:06d} - timestamp: {us // 1_000_000}.{us % 1_000_000:06d} - data: {data}\n"
+        for number, us in zip(itertools.count(first), timestamps_us)
+    ).encode()
+
+def write_sample_log(filename, size_mb=10, lines=None, seed=None, start_timestamp=LOG_START_TIMESTAMP,
+                     lines_per_second=LOG_LINES_PER_SECOND, payload=LOG_PAYLOAD, chunk_lines=LOG_CHUNK_LINES):
+    """
+    Write a log in memory_demo's line format: exactly `lines` lines if given,
+    otherwise whole lines until the file reaches size_mb. Lines are generated
+    a chunk at a time (vectorised with NumPy) and written as one large write
+    per chunk. Returns the number of lines written.
+    """
+    rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+    format_lines = _format_lines_numpy if np is not None else _format_lines_python
+    target_bytes = int(size_mb * 1024 * 1024)
+    start_us = int(start_timestamp * 1_000_000)
+    written = 0
+    line_number = 0
+    with open(filename, 'wb', buffering=0) as f:
+        while (line_number < lines) if lines is not None else (written < target_bytes):
+            # Keep each chunk's line numbers the same width (999999 | 1000000 ...)
+            count = min(chunk_lines, 10 ** max(6, len(str(line_number))) - line_number)
+            if lines is not None:
+                count = min(count, lines - line_number)
+            timestamps = _timestamps_us(rng, count, start_us, lines_per_second)
+            block = format_lines(line_number, timestamps, payload)
+            if lines is None and written + len(block) > target_bytes:
+                # Lines within a chunk share one width: trim to whole lines at the target size
+                line_bytes = len(block) // count
+                count = -(-(target_bytes - written) // line_bytes)
+                block = block[:count * line_bytes]
+            f.write(block)
+            written += len(block)
+            line_number += count
+            start_us = int(timestamps[count - 1])
+    return line_number
+
+if __name__ == "__main__":
+    from kitchen_schema import generate_ingredient_rows
+
+    print("🏭 BULK DATA GENERATION")
+    print("="*70)
+    print(f"   NumPy: {'yes' if np is not None else 'no (pure-Python fallback)'}")
+
+    db_path = 'kitchen_datagen_demo.db'
+    rows_per_ingredient = 250_000
+    total_rows = rows_per_ingredient * len(PIZZA_INGREDIENTS)
+    for label, build in (
+        ('per-row random', lambda: create_ingredients_database(
+            db_path, rows=generate_ingredient_rows(rows_per_ingredient, seed=42), rows_per_ingredient=rows_per_ingredient)),
+        ('vectorised', lambda: build_ingredients_database(db_path, rows_per_ingredient=rows_per_ingredient, seed=42)),
+        ('fixture (first)', lambda: build_ingredients_database(db_path, rows_per_ingredient=rows_per_ingredient, seed=42,
+                                                               fixtures=True)),
+        ('fixture (reused)', lambda: build_ingredients_database(db_path, rows_per_ingredient=rows_per_ingredient, seed=42,
+                                                                fixtures=True)),
+    ):
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        start = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - start
+        print(f"   🗄️  {label:<18} {total_rows:,} rows in {elapsed:6.2f}s ({total_rows / elapsed:>12,.0f} rows/s)")
+    os.remove(db_path)
+
+    log_path = 'kitchen_datagen_demo.log'
+    size_mb = 200
+    start = time.perf_counter()
+    lines = write_sample_log(log_path, size_mb=size_mb, seed=42)
+    elapsed = time.perf_counter() - start
+    print(f"   📝 sample log        {lines:,} lines, {os.path.getsize(log_path) / 1024 / 1024:.0f} MB in "
+          f"{elapsed:6.2f}s ({size_mb / elapsed:,.0f} MB/s)")
+    os.remove(log_path)
+    print("="*70)
+    print(f"💾 Fixtures live in {FIXTURE_DIR}/ - delete it to force a rebuild")
@@ -0,0 +1,128 @@
+import sqlite3
+import time
+from collections import defaultdict
+
+from kitchen_pool import get_pool
+from kitchen_cache import notify_ingredients_changed
+from kitchen_trace import span
+
+class StockLedger:
+    """
+    Buffers per-pizza stock decrements in memory and writes them in batches.
+    Each ingredient's rows are treated as stock bins and consumed round-robin;
+    decrements to the same bin are coalesced before the flush, which runs as
+    one BEGIN IMMEDIATE ... executemany ... COMMIT transaction.
+    """
+    def __init__(self, db_path, flush_size=500, flush_interval_s=None, portion=1,
+                 max_lock_retries=5, clock=time.perf_counter):
+        self.db_path = db_path
+        self.flush_size = flush_size              # Flush after this many orders...
+        self.flush_interval_s = flush_interval_s  # ...or after this long, whichever is first
+        self.portion = portion
+        self.max_lock_retries = max_lock_retries
+        self.clock = clock
+
+        self._bins = {}
+        self._next_bin = defaultdict(int)
+        self._pending = defaultdict(int)  # row id -> quantity to deduct
+        self._pending_names = set()
+        self._pending_orders = 0
+        self._last_flush = clock()
+
+        self.orders_consumed = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.write_time_s = 0.0
+        self.last_flush_s = 0.0
+        self.lock_wait_s = 0.0
+        self.lock_retries = 0
+
+    def _bins_for(self, ingredient_name):
+        bins = self._bins.get(ingredient_name)
+        if bins is None:
+            with get_pool(self.db_path).connection() as conn:
+                cursor = conn.execute('SELECT id FROM ingredients WHERE name = ? ORDER BY id', (ingredient_name,))
+                bins = [row_id for (row_id,) in cursor]
+            if not bins:
+                raise KeyError(f"No stock rows for ingredient '{ingredient_name}'")
+            self._bins[ingredient_name] = bins
+        return bins
+
+    def consume(self, order):
+        """Deduct one portion of every ingredient in order; returns True if this triggered a flush"""
+        for ingredient_name in order:
+            bins = self._bins_for(ingredient_name)
+            position = self._next_bin[ingredient_name]
+            self._pending[bins[position % len(bins)]] += self.portion
+            self._next_bin[ingredient_name] = position + 1
+            self._pending_names.add(ingredient_name)
+        self._pending_orders += 1
+        self.orders_consumed += 1
+
+        if self._pending_orders >= self.flush_size or (
+                self.flush_interval_s is not None and self.clock() - self._last_flush >= self.flush_interval_s):
+            self.flush()
+            return True
+        return False
+
+    def _begin_immediate(self, conn):
+        # Take the write lock up front so contention shows up here, not mid-batch
+        start = self.clock()
+        for attempt in range(self.max_lock_retries + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == self.max_lock_retries:
+                    raise
+                self.lock_retries += 1
+        self.lock_wait_s += self.clock() - start
+
+    def flush(self):
+        """Write every buffered decrement in a single transaction"""
+        self._last_flush = self.clock()
+        if not self._pending:
+            self._pending_orders = 0
+            return 0
+
+        updates = [(amount, row_id) for row_id, amount in self._pending.items()]
+        names = sorted(self._pending_names)
+        start = self.clock()
+        with span('stock.flush'), get_pool(self.db_path).connection() as conn:
+            self._begin_immediate(conn)
+            try:
+                conn.executemany('UPDATE ingredients SET quantity = MAX(quantity - ?, 0) WHERE id = ?', updates)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self.last_flush_s = self.clock() - start
+        self.write_time_s += self.last_flush_s
+
+        self.flushes += 1
+        self.rows_written += len(updates)
+        self._pending.clear()
+        self._pending_names.clear()
+        self._pending_orders = 0
+
+        # Cached ingredient data is stale once stock has moved
+        notify_ingredients_changed(self.db_path, names)
+        return len(updates)
+
+    def stats(self):
+        return {
+            'orders_consumed': self.orders_consumed,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'write_time_s': self.write_time_s,
+            'lock_wait_s': self.lock_wait_s,
+            'lock_retries': self.lock_retries,
+        }
+
+def record_stock_stats(demo, ledger):
+    """Copy ledger counters onto a KitchenDemo"""
+    demo.stock_flushes = ledger.flushes
+    demo.stock_rows_written = ledger.rows_written
+    demo.stock_write_time_s = ledger.write_time_s
+    demo.stock_lock_wait_s = ledger.lock_wait_s
+    demo.stock_lock_retries = ledger.lock_retries
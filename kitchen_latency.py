@@ -0,0 +1,192 @@
+import functools
+import math
+import random
+import time
+
+JITTER_DISTRIBUTIONS = ('none', 'uniform', 'normal', 'lognormal', 'exponential')
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (p in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def lognormal_sigma(median, std):
+    """Log-space sigma of the lognormal with this median and standard deviation"""
+    if median <= 0 or std <= 0:
+        return 0.0
+    # Variance of a lognormal is median^2 * e^(s^2) * (e^(s^2) - 1); solve for e^(s^2)
+    ratio = std / median
+    return math.sqrt(math.log((1 + math.sqrt(1 + 4 * ratio * ratio)) / 2))
+
+class LatencyModel:
+    """
+    Round-trip latency for one Cloud SQL query.
+    rtt_ms is the typical round trip; jitter_ms is the standard deviation
+    of the round trip in milliseconds, whichever distribution shapes it.
+    connect_ms is the cost of opening a new connection (TCP + TLS + auth),
+    paid once per connection.
+    """
+    def __init__(self, rtt_ms=1.5, jitter='lognormal', jitter_ms=0.5, connect_ms=0.0, seed=None):
+        if jitter not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter '{jitter}' (expected one of {', '.join(JITTER_DISTRIBUTIONS)})")
+        self.rtt_ms = rtt_ms
+        self.jitter = jitter
+        self.jitter_ms = jitter_ms
+        self.connect_ms = connect_ms
+        self._rng = random.Random(seed)
+        self._log_sigma = lognormal_sigma(rtt_ms, jitter_ms)
+
+    def sample_s(self):
+        """One round-trip time in seconds"""
+        if self.jitter == 'none' or self.jitter_ms <= 0:
+            ms = self.rtt_ms
+        elif self.jitter == 'uniform':
+            half_width = self.jitter_ms * math.sqrt(3)
+            ms = self.rtt_ms + self._rng.uniform(-half_width, half_width)
+        elif self.jitter == 'normal':
+            ms = self._rng.gauss(self.rtt_ms, self.jitter_ms)
+        elif self.jitter == 'lognormal':
+            # Median rtt_ms with a long right tail, like real network round trips
+            ms = self.rtt_ms * self._rng.lognormvariate(0, self._log_sigma)
+        else:
+            ms = self.rtt_ms + self._rng.expovariate(1 / self.jitter_ms)
+        return max(ms, 0.0) / 1000
+
+    def connect_s(self):
+        return self.connect_ms / 1000
+
+def as_latency_model(latency):
+    """Accept a LatencyModel or a fixed delay in seconds"""
+    if isinstance(latency, LatencyModel):
+        return latency
+    return LatencyModel(rtt_ms=latency * 1000, jitter='none')
+
+class SimulatedLatencyStorage:
+    """
+    Storage backend that adds a sampled network round trip to every query,
+    so local SQLite behaves like Cloud SQL on the wall clock. Kitchens pass
+    their own fetch functions through wrap(), so the delayed queries still
+    read that kitchen's database. reuse_connections=False charges the
+    connection-setup cost on every query (what an unpooled client pays).
+    """
+    def __init__(self, model=None, fetch=None, batch_fetch=None, fetch_all=None,
+                 reuse_connections=True, sleep=time.sleep):
+        self.model = model or LatencyModel()
+        self._fetch = fetch
+        self._batch_fetch = batch_fetch
+        self._fetch_all = fetch_all
+        self.reuse_connections = reuse_connections
+        self.sleep = sleep
+        self._connected = False
+
+        self.queries = 0
+        self.connects = 0
+        self.latencies_s = []
+
+    def _query(self, func, *args):
+        start = time.perf_counter()
+        delay = self.model.sample_s()
+        if self.model.connect_ms and (not self._connected or not self.reuse_connections):
+            delay += self.model.connect_s()
+            self.connects += 1
+            self._connected = True
+        self.sleep(delay)
+        result = func(*args)
+        self.queries += 1
+        self.latencies_s.append(time.perf_counter() - start)
+        return result
+
+    def wrap(self, func):
+        """func with a simulated round trip added to every call"""
+        @functools.wraps(func)
+        def delayed(*args):
+            return self._query(func, *args)
+        return delayed
+
+    def _require(self, func, argument):
+        if func is None:
+            raise ValueError(f"SimulatedLatencyStorage was created without {argument}=; "
+                             f"pass it, or let the kitchen supply its own via storage.wrap()")
+        return func
+
+    def fetch_ingredient_data(self, ingredient_name):
+        return self._query(self._require(self._fetch, 'fetch'), ingredient_name)
+
+    def fetch_ingredients_for_orders(self, orders, window=250):
+        return self._query(self._require(self._batch_fetch, 'batch_fetch'), orders, window)
+
+    def fetch_all_ingredients(self):
+        return self._query(self._require(self._fetch_all, 'fetch_all'))
+
+    def percentiles(self, points=(50, 90, 99)):
+        """Query latency percentiles in milliseconds"""
+        return {p: percentile(self.latencies_s, p) * 1000 for p in points}
+
+    def reset(self):
+        self.queries = 0
+        self.connects = 0
+        self.latencies_s = []
+        self._connected = False
+
+def latency_comparison(num_orders, model=None, batch_size=1000):
+    """
+    Run the chaotic N+4 path and the batched path against the same latency
+    model; returns {path: {'elapsed_s', 'queries', 'query_ms', 'order_ms'}}.
+    """
+    import dough_re_mi
+    import kitchen_batch
+    import fresh_pizza_of_belair
+
+    model = model or LatencyModel(seed=42)
+    results = {}
+
+    # N+4: four round trips per pizza
+    dough_re_mi.setup_database(seed=42)
+    storage = SimulatedLatencyStorage(model)
+    fetch = storage.wrap(dough_re_mi.fetch_ingredient_data)
+    demo = dough_re_mi.KitchenDemo()
+    order_times = []
+    start_time = time.perf_counter()
+    for _ in range(num_orders):
+        order_start = time.perf_counter()
+        dough_re_mi.make_pizza(demo, fetch=fetch)
+        order_times.append(time.perf_counter() - order_start)
+    results['n_plus_4'] = {
+        'elapsed_s': time.perf_counter() - start_time,
+        'queries': storage.queries,
+        'query_ms': storage.percentiles(),
+        'order_ms': {p: percentile(order_times, p) * 1000 for p in (50, 90, 99)},
+    }
+
+    # Batched: one round trip per batch_size pizzas
+    fresh_pizza_of_belair.setup_database(seed=42)
+    storage = SimulatedLatencyStorage(model)
+    demo = fresh_pizza_of_belair.KitchenDemo()
+    order_times = []
+    start_time = time.perf_counter()
+    for batch_start in range(0, num_orders, batch_size):
+        batch_orders = min(batch_size, num_orders - batch_start)
+        batch_time = time.perf_counter()
+        kitchen_batch.run_batched_orders(demo, batch_orders, batch_size, storage=storage)
+        # Every order in a batch is ready when its batch is
+        order_times.extend([time.perf_counter() - batch_time] * batch_orders)
+    results['batched'] = {
+        'elapsed_s': time.perf_counter() - start_time,
+        'queries': storage.queries,
+        'query_ms': storage.percentiles(),
+        'order_ms': {p: percentile(order_times, p) * 1000 for p in (50, 90, 99)},
+    }
+    return results
+
+if __name__ == "__main__":
+    model = LatencyModel(rtt_ms=1.5, jitter='lognormal', jitter_ms=0.6, connect_ms=25, seed=42)
+    print("🌐 SIMULATED CLOUD SQL: 1.5 ms median round trip, lognormal jitter, 25 ms connect")
+    print("="*70)
+    for path, stats in latency_comparison(2_000, model).items():
+        print(f"{path:>9}: {stats['elapsed_s']:7.2f}s wall-clock, {stats['queries']:,} queries")
+        print(f"           query p50 {stats['query_ms'][50]:.2f} ms / p99 {stats['query_ms'][99]:.2f} ms")
+        print(f"           order p50 {stats['order_ms'][50]:.3f} ms / p99 {stats['order_ms'][99]:.3f} ms")
+    print("="*70)
@@ -0,0 +1,146 @@
+import random
+import statistics
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path always works
+    np = None
+
+class IngredientColumns:
+    """Columnar ingredient data: quantity int32 and cost float64 arrays (NumPy or memoryview)"""
+    __slots__ = ('quantity', 'cost')
+
+    def __init__(self, quantity, cost):
+        self.quantity = quantity
+        self.cost = cost
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def __iter__(self):
+        # (quantity, cost) pairs, so the per-row Python processor accepts columns too
+        return zip(self.quantity, self.cost)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return IngredientColumns(self.quantity[index], self.cost[index])
+        return int(self.quantity[index]), float(self.cost[index])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build columns from (quantity, cost) tuples as returned by sqlite3"""
+        _require_numpy()
+        if not rows:
+            return cls(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64))
+        quantity, cost = zip(*rows)
+        return cls(np.fromiter(quantity, dtype=np.int32, count=len(rows)),
+                   np.fromiter(cost, dtype=np.float64, count=len(rows)))
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The 'numpy' processor needs NumPy installed (pip install numpy)")
+
+def make_rng(seed=None):
+    """Seeded NumPy Generator for reproducible vectorized runs"""
+    _require_numpy()
+    return np.random.default_rng(seed)
+
+def process_ingredient_columns(columns, rng):
+    """qty * 2 + rand(1, 10) and cost * 1.1 over whole columns in one pass"""
+    # asarray is zero-copy for buffers such as kitchen_store's memoryview columns
+    quantity = np.asarray(columns.quantity) * 2 + rng.integers(1, 11, size=len(columns), dtype=np.int32)
+    cost = np.asarray(columns.cost) * 1.1
+    return IngredientColumns(quantity, cost)
+
+def process_ingredient_data_numpy(ingredient_data, rng=None):
+    """
+    Drop-in replacement for process_ingredient_data.
+    Accepts sqlite3 rows or IngredientColumns and returns (IngredientColumns, cpu_ops).
+    """
+    columns = ingredient_data if isinstance(ingredient_data, IngredientColumns) else IngredientColumns.from_rows(ingredient_data)
+    processed = process_ingredient_columns(columns, rng if rng is not None else _default_rng())
+    return processed, len(columns) + 1
+
+_rng = None
+
+def _default_rng():
+    global _rng
+    if _rng is None:
+        _rng = make_rng()
+    return _rng
+
+def get_processor(name='python', seed=None):
+    """
+    Return a process_ingredient_data-compatible callable.
+    'python' is the original per-row list comprehension; 'numpy' is the vectorized backend.
+    """
+    if name == 'python':
+        from fresh_pizza_of_belair import process_ingredient_data
+        return process_ingredient_data
+    if name == 'numpy':
+        rng = make_rng(seed)
+        return lambda ingredient_data: process_ingredient_data_numpy(ingredient_data, rng)
+    raise ValueError(f"Unknown processor '{name}' (expected 'python' or 'numpy')")
+
+def compare_backends(ingredient_data, trials=200, seed=42):
+    """
+    Run both backends repeatedly over the same rows and summarise the outputs.
+    Returns per-backend mean/stdev of processed quantity and cost; the random
+    term makes outputs differ row by row, so equivalence is statistical.
+    """
+    from fresh_pizza_of_belair import process_ingredient_data
+
+    random.seed(seed)
+    rng = make_rng(seed)
+    summary = {}
+    for backend in ('python', 'numpy'):
+        quantities = []
+        costs = []
+        for _ in range(trials):
+            if backend == 'python':
+                processed, _ = process_ingredient_data(ingredient_data)
+                quantities.extend(qty for qty, _ in processed)
+                costs.extend(cost for _, cost in processed)
+            else:
+                processed, _ = process_ingredient_data_numpy(ingredient_data, rng)
+                quantities.extend(processed.quantity.tolist())
+                costs.extend(processed.cost.tolist())
+        summary[backend] = {
+            'quantity_mean': statistics.fmean(quantities),
+            'quantity_stdev': statistics.stdev(quantities),
+            'cost_mean': statistics.fmean(costs),
+            'cost_stdev': statistics.stdev(costs),
+        }
+
+    # Expected noise of the quantity mean: rand(1, 10) has variance 8.25
+    standard_error = (8.25 / (len(ingredient_data) * trials)) ** 0.5
+    difference = abs(summary['python']['quantity_mean'] - summary['numpy']['quantity_mean'])
+    summary['quantity_mean_diff'] = difference
+    summary['equivalent'] = (difference <= 4 * standard_error * 2 ** 0.5
+                             and abs(summary['python']['cost_mean'] - summary['numpy']['cost_mean']) < 1e-9)
+    return summary
+
+if __name__ == "__main__":
+    import time
+    from fresh_pizza_of_belair import setup_database, fetch_ingredient_data, process_ingredient_data
+
+    setup_database(seed=42)
+    rows, _ = fetch_ingredient_data('cheese')
+
+    print("🔬 STATISTICAL EQUIVALENCE: python vs numpy processor")
+    summary = compare_backends(rows)
+    for backend in ('python', 'numpy'):
+        stats = summary[backend]
+        print(f"   {backend:<7} qty mean {stats['quantity_mean']:.3f} (sd {stats['quantity_stdev']:.3f})  "
+              f"cost mean {stats['cost_mean']:.6f}")
+    print(f"   Equivalent: {'✅' if summary['equivalent'] else '❌'} (|Δ qty mean| = {summary['quantity_mean_diff']:.4f})")
+
+    columns = IngredientColumns.from_rows(rows)
+    rng = make_rng(42)
+    for label, func, data in (('python', process_ingredient_data, rows),
+                              ('numpy', lambda d: process_ingredient_data_numpy(d, rng), columns)):
+        start = time.perf_counter()
+        for _ in range(10_000):
+            func(data)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000 / 10_000
+        print(f"⏱️  {label:<7} {elapsed_us:8.1f} µs per {len(rows)}-row batch")
@@ -0,0 +1,161 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import dough_re_mi
+import fresh_pizza_of_belair
+from kitchen_pool import get_pool, forget_pools, pool_counters, record_pool_stats
+from kitchen_cache import IngredientCache, record_cache_stats
+from kitchen_numpy import get_processor
+from kitchen_store import IngredientStore
+
+KITCHENS = {
+    'chaotic': dough_re_mi,
+    'optimised': fresh_pizza_of_belair,
+}
+
+def shard_orders(num_orders, workers):
+    """Split range(num_orders) into `workers` contiguous (start, stop) shards"""
+    base, extra = divmod(num_orders, workers)
+    shards = []
+    start = 0
+    for worker in range(workers):
+        stop = start + base + (1 if worker < extra else 0)
+        if stop > start:
+            shards.append((start, stop))
+        start = stop
+    return shards
+
+def available_cpus():
+    """CPUs this process may run on (its affinity mask), not every core in the machine"""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:  # macOS and Windows have no sched_getaffinity
+        return os.cpu_count() or 1
+
+def _init_worker():
+    # Forked workers inherit the parent's pools - SQLite connections must not cross a fork
+    forget_pools()
+
+def _run_shard(kitchen, start, stop, processor='python', seed=None, store_handle=None):
+    """
+    Process orders [start, stop) in a worker; returns that worker's KitchenDemo.
+    With store_handle the optimised kitchen reads the parent's shared-memory
+    ingredient snapshot instead of running its own mega-query.
+    """
+    module = KITCHENS[kitchen]
+    if seed is not None:
+        random.seed(seed + start)
+
+    # Each worker gets its own read-only connection: readers never fight over the write lock
+    pool = get_pool(module.DB_PATH, max_size=1, read_only=True)
+    # The pool lives as long as the worker process, which may run several shards
+    pool_start = pool_counters(pool)
+    process = module.process_ingredient_data if processor == 'python' else get_processor(
+        processor, None if seed is None else seed + start)
+
+    demo = module.KitchenDemo()
+    start_time = time.perf_counter()
+    if kitchen == 'chaotic':
+        with demo.meter.phase('orders'):
+            for _ in range(start, stop):
+                module.make_pizza(demo, process)
+    else:
+        # Warm from the shared snapshot (zero-copy) or, without one, from a per-worker mega-query
+        cache = IngredientCache()
+        store = IngredientStore.attach(store_handle) if store_handle is not None else None
+        try:
+            with demo.meter.phase('batch'):
+                module.warm_ingredient_cache(demo, cache, process, store=store)
+        finally:
+            if store is not None:
+                store.close()
+        with demo.meter.phase('assembly'):
+            for _ in range(start, stop):
+                module.assemble_pizza(demo, cache, process)
+        record_cache_stats(demo, cache)
+    demo.elapsed_s = time.perf_counter() - start_time
+    record_pool_stats(demo, pool, since=pool_start)
+    return demo
+
+def run_parallel_orders(kitchen, num_orders, workers, processor='python', seed=None, shared_store=True):
+    """
+    Shard num_orders across a process pool and merge the per-worker KitchenDemo counters.
+    shared_store=True (optimised kitchen only) loads the ingredients once in the parent
+    and publishes them via shared memory, so N workers cost one query, not N.
+    """
+    module = KITCHENS[kitchen]
+    merged = module.KitchenDemo()
+    shards = shard_orders(num_orders, workers)
+
+    start_time = time.perf_counter()
+    store = None
+    store_handle = None
+    if kitchen == 'optimised' and shared_store:
+        query_start = time.perf_counter()
+        store = module.fetch_all_ingredients()
+        merged.meter.record_query(len(store), store.nbytes, time.perf_counter() - query_start)
+        merged.storage_trips += 1
+        store_handle = store.publish()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = [executor.submit(_run_shard, kitchen, start, stop, processor, seed, store_handle)
+                       for start, stop in shards]
+            for future in futures:
+                merged.merge(future.result())
+    finally:
+        if store is not None:
+            store.unlink()
+    # Wall-clock for the whole fan-out, including process start-up
+    merged.elapsed_s = time.perf_counter() - start_time
+    return merged
+
+def parallel_kitchen_demo(num_orders_to_show, workers=None, kitchen='optimised', processor='python'):
+    workers = workers or available_cpus()
+    module = KITCHENS[kitchen]
+    print("\n" + "="*70)
+    print(f"🍕 PARALLEL {kitchen.upper()} KITCHEN - {workers} WORKER PROCESSES 🍕")
+    print("="*70)
+
+    module.setup_database()
+    demo = run_parallel_orders(kitchen, num_orders_to_show, workers, processor)
+
+    print(f"🍕 Total Pizzas Processed: {demo.orders_completed:,}")
+    print(f"🔄 Total DB Queries: {demo.storage_trips:,} (merged across {workers} workers)")
+    print(f"💸 Total Processing Cost: R{demo.total_cost_zar:.4f} (summed over every worker's CPU and memory)")
+    print(f"⏱️  Wall-clock Time: {demo.elapsed_s:.2f}s ({demo.orders_completed / demo.elapsed_s:,.0f} pizzas/s)")
+    return demo
+
+def speedup_sweep(num_orders, worker_counts=None, kitchen='chaotic', processor='python'):
+    """
+    Return (workers, elapsed_s, pizzas_per_second, speedup, efficiency) rows.
+    Speedup is relative to the first (smallest) worker count in the sweep.
+    """
+    if worker_counts is None:
+        cores = available_cpus()
+        worker_counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    KITCHENS[kitchen].setup_database()
+
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        demo = run_parallel_orders(kitchen, num_orders, workers, processor, seed=42)
+        if baseline is None:
+            baseline = (workers, demo.elapsed_s)
+        speedup = baseline[1] / demo.elapsed_s
+        results.append((workers, demo.elapsed_s, demo.orders_completed / demo.elapsed_s,
+                        speedup, speedup / (workers / baseline[0])))
+    return results
+
+if __name__ == "__main__":
+    print(f"🖥️  {available_cpus()} usable CPUs ({os.cpu_count()} cores in the machine)")
+    parallel_kitchen_demo(80_000, kitchen='optimised')
+
+    print("\n" + "="*70)
+    print("📈 SPEEDUP VS WORKER COUNT - CHAOTIC KITCHEN (15,000 pizzas)")
+    print("="*70)
+    print(f"{'Workers':>8} {'Time (s)':>10} {'Pizzas/s':>12} {'Speedup':>9} {'Efficiency':>11}")
+    for workers, elapsed, throughput, speedup, efficiency in speedup_sweep(15_000):
+        print(f"{workers:>8} {elapsed:>10.2f} {throughput:>12,.0f} {speedup:>8.2f}x {efficiency:>10.0%}")
+    print("="*70)
@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from kitchen_trace import span
+
+# Pragmas applied once, when a pooled connection is first opened
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),      # Readers never block the writer
+    ('synchronous', 'NORMAL'),    # Safe with WAL, far fewer fsyncs
+    ('cache_size', -16000),       # ~16MB page cache per connection
+    ('temp_store', 'MEMORY'),
+)
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of SQLite connections.
+    Connections are opened lazily up to max_size and reused after that,
+    so the connect + pragma cost is paid once instead of once per query.
+    """
+    def __init__(self, db_path, max_size=4, timeout=30.0, read_only=False,
+                 cached_statements=128, pragmas=DEFAULT_PRAGMAS):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self.cached_statements = cached_statements
+        self.pragmas = pragmas
+
+        self._idle = []
+        self._all = []
+        self._opening = 0      # Slots reserved by checkouts still connecting
+        self._lock = threading.Condition()
+        self._closed = False
+
+        # Counters fed into KitchenDemo stats
+        self.hits = 0          # Checkouts served by an idle connection
+        self.misses = 0        # Checkouts that had to open a new connection
+        self.waits = 0         # Checkouts that blocked on a full pool
+        self.wait_time_s = 0.0
+
+    def _open(self):
+        with span('db.connect'):
+            return self._connect()
+
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True,
+                                   check_same_thread=False,
+                                   cached_statements=self.cached_statements)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=self.cached_statements)
+        for pragma, value in self.pragmas:
+            if self.read_only and pragma == 'journal_mode':
+                continue  # Read-only connections cannot switch journal mode
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def acquire(self):
+        start = None
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+                if self._idle:
+                    if start is not None:
+                        self.wait_time_s += time.perf_counter() - start
+                    self.hits += 1
+                    return self._idle.pop()
+                if len(self._all) + self._opening < self.max_size:
+                    # Reserve the slot now, open the connection outside the lock
+                    if start is not None:
+                        self.wait_time_s += time.perf_counter() - start
+                    self.misses += 1
+                    self._opening += 1
+                    break
+
+                # Pool exhausted - wait for another thread to return a connection
+                if start is None:
+                    self.waits += 1
+                    start = time.perf_counter()
+                    deadline = start + self.timeout
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.wait_time_s += time.perf_counter() - start
+                    raise TimeoutError(f"No connection available for {self.db_path} after {self.timeout}s")
+                self._lock.wait(remaining)
+
+        # Connect + pragmas can be slow - other checkouts and returns carry on meanwhile
+        try:
+            conn = self._open()
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+                self._lock.notify()  # A waiter can use the freed slot
+            raise
+
+        with self._lock:
+            self._opening -= 1
+            if self._closed:
+                conn.close()
+                raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+            self._all.append(conn)
+            return conn
+
+    def release(self, conn):
+        with self._lock:
+            if self._closed:
+                conn.close()
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append(conn)
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'waits': self.waits,
+            'wait_time_s': self.wait_time_s,
+            'open_connections': len(self._all),
+        }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for conn in self._all:
+                conn.close()
+            self._all = []
+            self._idle = []
+            self._lock.notify_all()
+
+# One pool per database file, shared by every kitchen in the process
+_pools = {}
+_pools_lock = threading.Lock()
+_forgotten_pools = []
+
+def get_pool(db_path, **kwargs):
+    """Return the shared pool for db_path, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path, **kwargs)
+            _pools[db_path] = pool
+        return pool
+
+def close_pool(db_path):
+    """Close and forget the pool for db_path (call before deleting the file)"""
+    with _pools_lock:
+        pool = _pools.pop(db_path, None)
+    if pool is not None:
+        pool.close()
+
+def forget_pools():
+    """
+    Drop inherited pools without closing them - for forked worker processes,
+    whose copies of the parent's connections must never be used or closed.
+    """
+    with _pools_lock:
+        # Keep references so the inherited connections are never deallocated (and closed) here
+        _forgotten_pools.extend(_pools.values())
+        _pools.clear()
+
+POOL_COUNTERS = ('hits', 'misses', 'waits', 'wait_time_s')
+
+def pool_counters(pool):
+    """Snapshot of a pool's counters, for record_pool_stats(..., since=)"""
+    return {name: getattr(pool, name) for name in POOL_COUNTERS}
+
+def record_pool_stats(demo, pool, since=None):
+    """
+    Copy pool counters onto a KitchenDemo. since= (a pool_counters()
+    snapshot) records only what happened after it, for pools that outlive
+    the run - e.g. one per worker process, shared by every shard it runs.
+    """
+    for name in POOL_COUNTERS:
+        value = getattr(pool, name)
+        if since is not None:
+            value -= since[name]
+        setattr(demo, f'pool_{name}', value)
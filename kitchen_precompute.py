@@ -0,0 +1,201 @@
+from array import array
+
+from kitchen_pool import get_pool
+from kitchen_numpy import IngredientColumns
+from kitchen_store import IngredientStore, QUANTITY_TYPECODE, COST_TYPECODE
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; results are stored as plain array bytes either way
+    np = None
+
+# Per-name change counters, bumped by triggers on every write to ingredients.
+# Processed results are stored with the version they were computed from.
+TRACKING_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS ingredient_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS processed_ingredients ('
+    'name TEXT NOT NULL, processor TEXT NOT NULL, version INTEGER NOT NULL, '
+    'rows INTEGER NOT NULL, quantity BLOB NOT NULL, cost BLOB NOT NULL, PRIMARY KEY (name, processor))',
+)
+
+_BUMP = ('INSERT INTO ingredient_versions (name, version) VALUES ({row}.name, 1) '
+         'ON CONFLICT (name) DO UPDATE SET version = version + 1;')
+
+TRACKING_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS ingredients_version_insert AFTER INSERT ON ingredients '
+    f'BEGIN {_BUMP.format(row="NEW")} END',
+    f'CREATE TRIGGER IF NOT EXISTS ingredients_version_delete AFTER DELETE ON ingredients '
+    f'BEGIN {_BUMP.format(row="OLD")} END',
+    f'CREATE TRIGGER IF NOT EXISTS ingredients_version_update AFTER UPDATE ON ingredients '
+    f'BEGIN {_BUMP.format(row="NEW")} END',
+    # A row moved to another name also changes the name it left
+    f'CREATE TRIGGER IF NOT EXISTS ingredients_version_rename AFTER UPDATE OF name ON ingredients '
+    f'WHEN OLD.name IS NOT NEW.name BEGIN {_BUMP.format(row="OLD")} END',
+)
+
+STALE_SQL = (
+    'SELECT v.name, v.version FROM ingredient_versions v '
+    'LEFT JOIN processed_ingredients p ON p.name = v.name AND p.processor = ? '
+    'WHERE p.version IS NULL OR p.version != v.version'
+)
+
+FRESH_SQL = (
+    'SELECT p.name, p.rows, p.quantity, p.cost FROM processed_ingredients p '
+    'JOIN ingredient_versions v ON v.name = p.name AND v.version = p.version '
+    'WHERE p.processor = ?'
+)
+
+def install_version_tracking(db_path):
+    """
+    Create the version and processed tables plus the triggers (idempotent).
+    Names already in ingredients start at version 1, so the first warm start
+    computes everything once and later ones reuse it.
+    """
+    with get_pool(db_path).connection() as conn:
+        for statement in TRACKING_SCHEMA:
+            conn.execute(statement)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+                        "AND name = 'ingredients_version_insert'").fetchone() is None:
+            # Seed before the triggers exist; after this every write is counted
+            conn.execute('INSERT OR IGNORE INTO ingredient_versions (name, version) '
+                         'SELECT DISTINCT name, 1 FROM ingredients')
+            for statement in TRACKING_TRIGGERS:
+                conn.execute(statement)
+        conn.commit()
+
+def _column_bytes(values, typecode, dtype):
+    if np is not None and isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False).tobytes()
+    return array(typecode, values).tobytes()
+
+def _to_blobs(processed):
+    """(rows, quantity bytes, cost bytes) for an IngredientColumns or a list of (qty, cost) tuples"""
+    if isinstance(processed, IngredientColumns):
+        quantity, cost = processed.quantity, processed.cost
+    else:
+        quantity = [qty for qty, _ in processed]
+        cost = [unit_cost for _, unit_cost in processed]
+    return (len(processed),
+            _column_bytes(quantity, QUANTITY_TYPECODE, 'int32'),
+            _column_bytes(cost, COST_TYPECODE, 'float64'))
+
+def _from_blobs(quantity_bytes, cost_bytes):
+    quantity = array(QUANTITY_TYPECODE)
+    quantity.frombytes(quantity_bytes)
+    cost = array(COST_TYPECODE)
+    cost.frombytes(cost_bytes)
+    return IngredientColumns(quantity, cost)
+
+class PrecomputeResult:
+    """What a refresh reused and what it had to recompute"""
+    def __init__(self):
+        self.processed = {}      # name -> processed data (IngredientColumns when reused)
+        self.reused = []
+        self.recomputed = []
+        self.dropped = []        # Names with no rows left
+        self.queries = 0         # Reads and writes actually issued (schema setup excluded)
+        self.rows_fetched = 0
+        self.bytes_read = 0
+        self.cpu_operations = 0
+
+def refresh_precomputed(db_path, process, processor_name='python'):
+    """
+    Return a PrecomputeResult holding processed data for every ingredient.
+    Names whose version still matches their stored result are read back
+    from processed_ingredients; only the others are fetched, processed and
+    stored again.
+    """
+    install_version_tracking(db_path)
+    result = PrecomputeResult()
+    pool = get_pool(db_path)
+    with pool.connection() as conn:
+        # One read transaction, so fresh and stale lists agree with each other
+        conn.execute('BEGIN')
+        try:
+            stale = dict(conn.execute(STALE_SQL, (processor_name,)).fetchall())
+            result.queries += 2  # Stale versions, then the stored results still current
+            for name, rows, quantity_bytes, cost_bytes in conn.execute(FRESH_SQL, (processor_name,)):
+                result.processed[name] = _from_blobs(quantity_bytes, cost_bytes)
+                result.reused.append(name)
+                result.bytes_read += len(quantity_bytes) + len(cost_bytes)
+            store = None
+            if stale:
+                placeholders = ', '.join('?' * len(stale))
+                store = IngredientStore.from_rows(conn.execute(
+                    f'SELECT name, quantity, cost FROM ingredients WHERE name IN ({placeholders}) ORDER BY name, id',
+                    tuple(stale)))
+                result.queries += 1
+        finally:
+            conn.rollback()
+
+    if not stale:
+        return result
+
+    result.rows_fetched = len(store)
+    result.bytes_read += store.nbytes
+    updates = []
+    for name, version in stale.items():
+        if name not in store:
+            result.dropped.append(name)
+            continue
+        processed, cpu_ops = process(store.columns(name))
+        result.cpu_operations += cpu_ops
+        result.processed[name] = processed
+        result.recomputed.append(name)
+        updates.append((name, processor_name, version, *_to_blobs(processed)))
+
+    with pool.connection() as conn:
+        if updates:
+            conn.executemany('INSERT OR REPLACE INTO processed_ingredients (name, processor, version, rows, quantity, cost) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', updates)
+            result.queries += 1
+        if result.dropped:
+            # Forget names with no rows left; a version bumped since the read means rows came back
+            conn.executemany('DELETE FROM processed_ingredients WHERE name = ?',
+                             [(name,) for name in result.dropped])
+            conn.executemany('DELETE FROM ingredient_versions WHERE name = ? AND version = ?',
+                             [(name, stale[name]) for name in result.dropped])
+            result.queries += 2
+        conn.commit()
+    return result
+
+def ingredient_versions(db_path):
+    with get_pool(db_path).connection() as conn:
+        return dict(conn.execute('SELECT name, version FROM ingredient_versions ORDER BY name'))
+
+if __name__ == "__main__":
+    import os
+    import time
+    from kitchen_pool import close_pool
+    from kitchen_datagen import build_ingredients_database
+    from kitchen_numpy import get_processor
+
+    db_path = 'kitchen_precompute_demo.db'
+    close_pool(db_path)
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+    build_ingredients_database(db_path, rows_per_ingredient=250_000, seed=42)
+    process = get_processor('numpy' if np is not None else 'python')
+
+    print("♻️  INCREMENTAL PRECOMPUTATION")
+    print("="*70)
+
+    def timed_refresh(label):
+        start = time.perf_counter()
+        result = refresh_precomputed(db_path, process, 'numpy' if np is not None else 'python')
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"   {label:<28} {elapsed:8.1f} ms | reused {len(result.reused)} | "
+              f"recomputed {len(result.recomputed)} ({result.rows_fetched:,} rows fetched)")
+
+    timed_refresh('cold start')
+    timed_refresh('warm start, nothing changed')
+    with get_pool(db_path).connection() as conn:
+        conn.execute("UPDATE ingredients SET quantity = quantity - 1 WHERE id IN "
+                     "(SELECT id FROM ingredients WHERE name = 'cheese' LIMIT 10)")
+        conn.commit()
+    timed_refresh("after a 'cheese' stock write")
+    print(f"   versions: {ingredient_versions(db_path)}")
+    print("="*70)
+    close_pool(db_path)
+    os.remove(db_path)
@@ -0,0 +1,124 @@
+import itertools
+import random
+import sqlite3
+
+# Every pizza on the menu today uses the same four ingredients
+PIZZA_INGREDIENTS = ('dough', 'sauce', 'cheese', 'pepperoni')
+
+# The hot-path lookup both kitchens run for every ingredient fetch
+FETCH_INGREDIENT_SQL = 'SELECT quantity, cost FROM ingredients WHERE name = ? LIMIT 250'
+
+SCHEMA_VARIANTS = {
+    # Original schema: every WHERE name = ? is a full table scan
+    'plain': (
+        'CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER, cost REAL)',
+    ),
+    # Index on name: SEARCH by name, then a rowid lookup per row
+    'indexed': (
+        'CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER, cost REAL)',
+        'CREATE INDEX idx_ingredients_name ON ingredients (name)',
+    ),
+    # Covering index: the fetch is answered from the index alone
+    'covering': (
+        'CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER, cost REAL)',
+        'CREATE INDEX idx_ingredients_covering ON ingredients (name, quantity, cost)',
+    ),
+    # Clustered on (name, id): rows for one ingredient are stored together
+    'without_rowid': (
+        'CREATE TABLE ingredients (id INTEGER NOT NULL, name TEXT NOT NULL, quantity INTEGER, cost REAL, '
+        'PRIMARY KEY (name, id)) WITHOUT ROWID',
+    ),
+}
+
+def generate_ingredient_rows(rows_per_ingredient=250, names=PIZZA_INGREDIENTS, seed=None):
+    """Yield (id, name, quantity, cost) rows; scales to millions without building a list"""
+    rng = random.Random(seed) if seed is not None else random
+    row_id = 1
+    for name in names:
+        for _ in range(rows_per_ingredient):
+            yield row_id, name, rng.randint(100, 500), rng.uniform(1.0, 5.0)
+            row_id += 1
+
+# Bulk-load settings: no rollback journal or fsyncs while the table is filled.
+# A crash mid-load only means regenerating the file, so durability buys nothing here.
+BULK_LOAD_PRAGMAS = (
+    ('synchronous', 'OFF'),
+    ('journal_mode', 'OFF'),
+    ('cache_size', -65536),       # ~64MB, so index builds sort in memory
+    ('temp_store', 'MEMORY'),
+)
+
+def create_ingredients_database(db_path, schema='indexed', rows_per_ingredient=250,
+                                names=PIZZA_INGREDIENTS, seed=None, chunk_size=50_000,
+                                verify_plan=True, rows=None):
+    """
+    Create and populate the ingredients table using one of SCHEMA_VARIANTS.
+    rows overrides the generated (id, name, quantity, cost) rows, e.g. with
+    kitchen_datagen's vectorised generator. Rows go in as chunked executemany
+    calls inside one transaction; secondary indexes are built after the load.
+    """
+    if schema not in SCHEMA_VARIANTS:
+        raise ValueError(f"Unknown schema '{schema}' (expected one of {', '.join(SCHEMA_VARIANTS)})")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for pragma, value in BULK_LOAD_PRAGMAS:
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        # One sorted index build beats updating the index on every insert
+        statements = SCHEMA_VARIANTS[schema]
+        tables = [statement for statement in statements if not statement.startswith('CREATE INDEX')]
+        indexes = [statement for statement in statements if statement.startswith('CREATE INDEX')]
+        for statement in tables:
+            conn.execute(statement)
+
+        if rows is None:
+            rows = generate_ingredient_rows(rows_per_ingredient, names, seed)
+        rows = iter(rows)
+        conn.execute('BEGIN')
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            conn.executemany('INSERT INTO ingredients (id, name, quantity, cost) VALUES (?, ?, ?, ?)', chunk)
+        for statement in indexes:
+            conn.execute(statement)
+        conn.execute('COMMIT')
+        conn.execute('ANALYZE')
+
+        if verify_plan and schema != 'plain':
+            assert_fetch_uses_index(conn)
+    finally:
+        conn.close()
+
+def explain_query_plan(conn, sql=FETCH_INGREDIENT_SQL, params=('dough',)):
+    """Return the EXPLAIN QUERY PLAN detail lines for sql"""
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+def assert_fetch_uses_index(conn, sql=FETCH_INGREDIENT_SQL, params=('dough',)):
+    """Raise AssertionError if the fetch path falls back to a full table scan"""
+    plan = explain_query_plan(conn, sql, params)
+    if not any(detail.startswith('SEARCH') for detail in plan):
+        raise AssertionError(f"Ingredient fetch is not using an index: {' | '.join(plan)}")
+    return plan
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    # Compare the fetch path for each schema variant at inventory scale
+    db_path = 'schema_check.db'
+    rows_per_ingredient = 250_000
+    print(f"Scaling ingredients to {rows_per_ingredient * len(PIZZA_INGREDIENTS):,} rows per schema\n")
+    for schema in SCHEMA_VARIANTS:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        create_ingredients_database(db_path, schema, rows_per_ingredient, seed=42)
+        conn = sqlite3.connect(db_path)
+        fetches = PIZZA_INGREDIENTS * 250
+        start = time.perf_counter()
+        for name in fetches:
+            conn.execute(FETCH_INGREDIENT_SQL, (name,)).fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(fetches)
+        print(f"🔎 {schema:<14} {elapsed_ms:8.3f} ms/fetch  plan: {' | '.join(explain_query_plan(conn))}")
+        conn.close()
+    os.remove(db_path)
@@ -0,0 +1,182 @@
+import sys
+import tracemalloc
+from array import array
+from multiprocessing import shared_memory
+
+from kitchen_pool import get_pool, close_pool
+from kitchen_numpy import IngredientColumns
+
+QUANTITY_TYPECODE = 'i'  # int32, matching IngredientColumns
+COST_TYPECODE = 'd'      # float64
+
+LOAD_SQL = 'SELECT name, quantity, cost FROM ingredients ORDER BY name, id'
+
+class IngredientStore:
+    """
+    Every ingredient row in two flat typed columns, grouped by name, plus a
+    name -> (offset, length) index. Two buffers replace one tuple (and two
+    boxed numbers) per row, and columns(name) hands out zero-copy slices.
+    """
+    def __init__(self, quantity, cost, index, shm=None):
+        self.quantity = quantity  # array / memoryview of int32
+        self.cost = cost          # array / memoryview of float64
+        self.index = index
+        self._shm = shm
+        self._owner = False
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (name, quantity, cost) rows already ordered by name"""
+        quantity = array(QUANTITY_TYPECODE)
+        cost = array(COST_TYPECODE)
+        index = {}
+        current = None
+        start = 0
+        for name, qty, unit_cost in rows:
+            if name != current:
+                if current is not None:
+                    index[current] = (start, len(quantity) - start)
+                if name in index:
+                    raise ValueError(f"Rows for '{name}' are not contiguous - order them by name")
+                current = name
+                start = len(quantity)
+            quantity.append(qty)
+            cost.append(unit_cost)
+        if current is not None:
+            index[current] = (start, len(quantity) - start)
+        return cls(quantity, cost, index)
+
+    @classmethod
+    def load(cls, db_path):
+        """One query, streamed from the cursor straight into the columns (no fetchall list)"""
+        with get_pool(db_path).connection() as conn:
+            return cls.from_rows(conn.execute(LOAD_SQL))
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def names(self):
+        return list(self.index)
+
+    def columns(self, name):
+        """Zero-copy IngredientColumns view over one ingredient's rows"""
+        offset, length = self.index[name]
+        quantity = memoryview(self.quantity)[offset:offset + length]
+        cost = memoryview(self.cost)[offset:offset + length]
+        return IngredientColumns(quantity, cost)
+
+    def items(self):
+        for name in self.index:
+            yield name, self.columns(name)
+
+    @property
+    def nbytes(self):
+        return memoryview(self.quantity).nbytes + memoryview(self.cost).nbytes
+
+    def publish(self):
+        """
+        Copy both columns into one shared-memory block and return a small,
+        picklable handle that workers pass to IngredientStore.attach().
+        The publishing store owns the block: call unlink() when done.
+        """
+        quantity_bytes = memoryview(self.quantity).nbytes
+        cost_offset = -(-quantity_bytes // 8) * 8  # Keep the float64 column 8-byte aligned
+        size = max(cost_offset + memoryview(self.cost).nbytes, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:quantity_bytes] = memoryview(self.quantity).cast('B')
+        shm.buf[cost_offset:cost_offset + memoryview(self.cost).nbytes] = memoryview(self.cost).cast('B')
+        self._shm = shm
+        self._owner = True
+        return {'shm_name': shm.name, 'rows': len(self), 'cost_offset': cost_offset, 'index': dict(self.index)}
+
+    @classmethod
+    def attach(cls, handle):
+        """Map a published store read-only-by-convention, without copying the columns"""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=handle['shm_name'], track=False)
+        else:
+            # Workers started by the publisher's multiprocessing share its resource tracker,
+            # so this registration is a no-op there; only the publisher ever unlinks
+            shm = shared_memory.SharedMemory(name=handle['shm_name'])
+        rows = handle['rows']
+        quantity = shm.buf[:rows * 4].cast(QUANTITY_TYPECODE)
+        cost = shm.buf[handle['cost_offset']:handle['cost_offset'] + rows * 8].cast(COST_TYPECODE)
+        return cls(quantity, cost, handle['index'], shm)
+
+    def close(self):
+        """Release this process's mapping (views must not be used afterwards)"""
+        if self._shm is None:
+            return
+        if not self._owner:
+            # Drop our views first - SharedMemory.close() fails while buffers are exported
+            self.quantity.release()
+            self.cost.release()
+            self.quantity = self.cost = None
+        self._shm.close()
+
+    def unlink(self):
+        """Close and free the shared-memory block (publisher only)"""
+        if self._shm is None or not self._owner:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+def _traced_mb(build):
+    """Traced Python memory still held by what build() returns"""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current / 1024 / 1024
+
+def _tuple_cache(db_path):
+    # What the optimised kitchen used to hold: the fetchall list plus per-name tuple lists
+    with get_pool(db_path).connection() as conn:
+        all_ingredients = conn.execute(LOAD_SQL).fetchall()
+    ingredient_cache = {}
+    for name, qty, cost in all_ingredients:
+        ingredient_cache.setdefault(name, []).append((qty, cost))
+    return all_ingredients, ingredient_cache
+
+def compare_footprint(db_path):
+    """Return {'tuples_mb', 'store_mb', 'ratio'} for the same ingredient rows"""
+    tuples_mb = _traced_mb(lambda: _tuple_cache(db_path))
+    store_mb = _traced_mb(lambda: IngredientStore.load(db_path))
+    return {'tuples_mb': tuples_mb, 'store_mb': store_mb, 'ratio': tuples_mb / store_mb if store_mb else 0.0}
+
+if __name__ == "__main__":
+    import os
+    from kitchen_schema import create_ingredients_database
+
+    db_path = 'kitchen_store_demo.db'
+    print("🗃️  COLUMNAR INGREDIENT STORE vs TUPLE LISTS")
+    print("="*70)
+    for rows_per_ingredient in (250, 25_000, 250_000):
+        close_pool(db_path)
+        for path in (db_path, db_path + '-wal', db_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        create_ingredients_database(db_path, rows_per_ingredient=rows_per_ingredient, seed=42)
+        footprint = compare_footprint(db_path)
+        print(f"   {rows_per_ingredient * 4:>9,} rows: tuples {footprint['tuples_mb']:8.2f} MB | "
+              f"store {footprint['store_mb']:7.2f} MB | {footprint['ratio']:.1f}x smaller")
+    close_pool(db_path)
+    os.remove(db_path)
+    print("="*70)
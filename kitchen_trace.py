@@ -0,0 +1,266 @@
+import contextlib
+import functools
+import json
+import marshal
+import os
+import threading
+import time
+from array import array
+
+from kitchen_latency import percentile
+
+# The active Tracer, or None. Every entry point checks this one global first,
+# so disabled tracing costs a function call at most (and wrap() costs nothing)
+_tracer = None
+_NULL_SPAN = contextlib.nullcontext()
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start_ns', 'child_ns')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.child_ns = 0
+        self.tracer._stack().append(self)
+        self.start_ns = self.tracer.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._finish(self, self.tracer.clock())
+
+class Tracer:
+    """
+    Collects nested spans: a timeline of (name, start, duration, thread,
+    parent) events for Chrome traces, per-name duration arrays for
+    histograms, and caller -> callee totals for a pstats-compatible dump.
+    Past max_events the timeline stops growing; aggregates stay exact.
+    """
+    def __init__(self, max_events=1_000_000, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.max_events = max_events
+        self.started_ns = clock()
+        self.events = []
+        self.dropped_events = 0
+        self.durations = {}  # name -> array of ns
+        self._calls = {}     # (parent, name) -> [count, total ns, self ns]
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span, end_ns):
+        duration = end_ns - span.start_ns
+        stack = self._stack()
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            parent.child_ns += duration
+        parent_name = parent.name if parent is not None else None
+
+        durations = self.durations.get(span.name)
+        if durations is None:
+            durations = self.durations[span.name] = array('q')
+        durations.append(duration)
+        call = self._calls.get((parent_name, span.name))
+        if call is None:
+            call = self._calls[(parent_name, span.name)] = [0, 0, 0]
+        call[0] += 1
+        call[1] += duration
+        call[2] += duration - span.child_ns
+        if len(self.events) < self.max_events:
+            self.events.append((span.name, span.start_ns, duration, threading.get_ident(), parent_name))
+        else:
+            self.dropped_events += 1
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def summary(self):
+        """name -> {'count', 'total_ms', 'self_ms', 'mean_us', 'p50_us', 'p90_us', 'p99_us', 'max_us'}"""
+        self_ns = {}
+        for (_, name), (_, _, own) in self._calls.items():
+            self_ns[name] = self_ns.get(name, 0) + own
+        result = {}
+        for name, durations in self.durations.items():
+            values_us = [duration / 1000 for duration in durations]
+            result[name] = {
+                'count': len(values_us),
+                'total_ms': sum(durations) / 1e6,
+                'self_ms': self_ns[name] / 1e6,
+                'mean_us': sum(values_us) / len(values_us),
+                'p50_us': percentile(values_us, 50),
+                'p90_us': percentile(values_us, 90),
+                'p99_us': percentile(values_us, 99),
+                'max_us': max(values_us),
+            }
+        return result
+
+    def histogram(self, name):
+        """[(upper bound in us, count)] over power-of-two buckets"""
+        buckets = {}
+        for duration in self.durations.get(name, ()):
+            bound = 1
+            while bound * 1000 < duration:
+                bound *= 2
+            buckets[bound] = buckets.get(bound, 0) + 1
+        return sorted(buckets.items())
+
+    def to_chrome_trace(self):
+        """Trace-event JSON object (load it in chrome://tracing or Perfetto)"""
+        pid = os.getpid()
+        thread_ids = {}
+        events = []
+        for name, start_ns, duration, thread, parent in self.events:
+            tid = thread_ids.setdefault(thread, len(thread_ids) + 1)
+            events.append({
+                'name': name,
+                'cat': parent or 'root',
+                'ph': 'X',
+                'ts': (start_ns - self.started_ns) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': tid,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped_events}}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def to_pstats(self):
+        """The marshalled-dict layout pstats.Stats reads, with spans standing in for functions"""
+        def key(name):
+            return ('kitchen_trace', 0, name)
+
+        stats = {}
+        for (parent, name), (count, total, own) in self._calls.items():
+            entry = stats.setdefault(key(name), [0, 0, 0.0, 0.0, {}])
+            entry[0] += count
+            entry[1] += count
+            entry[2] += own / 1e9
+            entry[3] += total / 1e9
+            if parent is not None:
+                entry[4][key(parent)] = (count, count, own / 1e9, total / 1e9)
+        return {name: tuple(entry) for name, entry in stats.items()}
+
+    def export_pstats(self, path):
+        """Write a cProfile-compatible dump: pstats.Stats(path).sort_stats('cumulative').print_stats()"""
+        with open(path, 'wb') as f:
+            marshal.dump(self.to_pstats(), f)
+
+def enable(max_events=1_000_000):
+    """Start a fresh Tracer and route every span() into it"""
+    global _tracer
+    _tracer = Tracer(max_events)
+    return _tracer
+
+def disable():
+    """Stop tracing; returns the Tracer that was active (or None)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def active_tracer():
+    return _tracer
+
+@contextlib.contextmanager
+def tracing(max_events=1_000_000):
+    tracer = enable(max_events)
+    try:
+        yield tracer
+    finally:
+        if _tracer is tracer:
+            disable()
+
+def span(name):
+    """Context manager timing a block; a shared no-op while tracing is off"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name)
+
+def traced(name=None):
+    """Decorator: time every call as a span while tracing is on"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def wrap(func, name=None):
+    """
+    func itself when tracing is off, a traced wrapper when it is on.
+    Hot loops call this once before looping, so disabled tracing adds nothing per call.
+    """
+    if _tracer is None:
+        return func
+    return traced(name or getattr(func, '__name__', repr(func)))(func)
+
+def print_summary(tracer, histograms=()):
+    print("\n" + "="*90)
+    print("🔬 TRACE SUMMARY")
+    print("="*90)
+    print(f"{'Span':<28} {'Count':>9} {'Total (ms)':>11} {'Self (ms)':>10} {'p50 (us)':>9} {'p99 (us)':>9} {'Max (us)':>10}")
+    for name, row in sorted(tracer.summary().items(), key=lambda item: -item[1]['total_ms']):
+        print(f"{name:<28} {row['count']:>9,} {row['total_ms']:>11.1f} {row['self_ms']:>10.1f} "
+              f"{row['p50_us']:>9.1f} {row['p99_us']:>9.1f} {row['max_us']:>10.1f}")
+    for name in histograms:
+        buckets = tracer.histogram(name)
+        if not buckets:
+            continue
+        widest = max(count for _, count in buckets)
+        print(f"\n📊 {name} latency histogram")
+        for bound, count in buckets:
+            print(f"   <= {bound:>7,} us {count:>9,} {'█' * max(1, round(40 * count / widest))}")
+    if tracer.dropped_events:
+        print(f"\n⚠️  Timeline capped at {tracer.max_events:,} events ({tracer.dropped_events:,} dropped; summary is exact)")
+    print("="*90)
+
+if __name__ == "__main__":
+    import argparse
+    import io
+    import pstats
+    import dough_re_mi
+    import fresh_pizza_of_belair
+    # The kitchens import kitchen_trace, a different module object from this __main__
+    import kitchen_trace
+
+    parser = argparse.ArgumentParser(description="Trace where each kitchen spends its time")
+    parser.add_argument('--orders', type=int, default=2_000)
+    parser.add_argument('--chrome', default='kitchen_trace.json', help="Chrome trace-event JSON output path")
+    parser.add_argument('--pstats', default='kitchen_trace.pstats', help="pstats-compatible dump output path")
+    args = parser.parse_args()
+
+    with kitchen_trace.tracing() as tracer:
+        dough_re_mi.chaotic_kitchen_demo(args.orders, verbose=False, seed=42)
+        start = time.perf_counter()
+        fresh_pizza_of_belair.optimised_kitchen_demo(args.orders * 10, verbose=False, seed=42)
+        traced_s = time.perf_counter() - start
+
+    # The same run with tracing off: the wrapped functions are the plain ones again
+    start = time.perf_counter()
+    fresh_pizza_of_belair.optimised_kitchen_demo(args.orders * 10, verbose=False, seed=42)
+    untraced_s = time.perf_counter() - start
+
+    kitchen_trace.print_summary(tracer, histograms=('fetch_ingredient_data', 'process_ingredient_data'))
+    print(f"⏱️  Optimised kitchen: {untraced_s:.3f}s untraced vs {traced_s:.3f}s traced")
+    tracer.export_chrome_trace(args.chrome)
+    tracer.export_pstats(args.pstats)
+    print(f"💾 Chrome trace: {args.chrome} (open in chrome://tracing or ui.perfetto.dev)")
+    print(f"💾 pstats dump: {args.pstats}")
+    report = io.StringIO()
+    pstats.Stats(args.pstats, stream=report).sort_stats('cumulative').print_stats(5)
+    print(report.getvalue())
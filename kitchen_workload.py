@@ -0,0 +1,238 @@
+import bisect
+import csv
+import itertools
+import random
+import time
+
+from kitchen_latency import percentile
+from kitchen_schema import PIZZA_INGREDIENTS
+
+# Base recipes and how often each is ordered
+MENU = {
+    'pepperoni': PIZZA_INGREDIENTS,
+    'margherita': ('dough', 'sauce', 'cheese', 'basil'),
+    'hawaiian': ('dough', 'sauce', 'cheese', 'ham', 'pineapple'),
+    'veggie': ('dough', 'sauce', 'cheese', 'mushroom', 'green_pepper', 'onion', 'olives'),
+    'bbq_chicken': ('dough', 'bbq_sauce', 'cheese', 'chicken', 'onion'),
+    'meat_lovers': ('dough', 'sauce', 'cheese', 'pepperoni', 'ham', 'beef', 'bacon'),
+    'garlic_feta': ('dough', 'garlic_butter', 'feta', 'spinach'),
+}
+RECIPE_WEIGHTS = {
+    'pepperoni': 30, 'margherita': 20, 'hawaiian': 14, 'veggie': 10,
+    'bbq_chicken': 12, 'meat_lovers': 9, 'garlic_feta': 5,
+}
+
+# Extra toppings, most popular first - popularity falls off as 1 / rank^zipf_s
+EXTRA_TOPPINGS = (
+    'cheese', 'bacon', 'mushroom', 'pepperoni', 'jalapeno', 'onion', 'pineapple', 'olives',
+    'feta', 'chicken', 'green_pepper', 'peppadew', 'avocado', 'anchovies', 'biltong', 'chilli_flakes',
+)
+
+# Relative orders per hour of day (index 0 = midnight)
+HOURLY_PROFILES = {
+    'flat': (1,) * 24,
+    'weekday': (1, 0, 0, 0, 0, 0, 1, 2, 3, 3, 4, 9, 14, 10, 5, 4, 6, 10, 16, 18, 14, 8, 4, 2),
+    # Lunch bump, then the Friday-night rush peaking around 19:00
+    'friday_night': (2, 1, 0, 0, 0, 0, 1, 1, 2, 3, 4, 10, 15, 10, 5, 5, 8, 16, 30, 38, 32, 22, 12, 6),
+}
+
+class Order(tuple):
+    """An order is a tuple of ingredient names, tagged with its recipe and arrival time (seconds into the day)"""
+    def __new__(cls, ingredients, recipe=None, arrival_s=None):
+        order = super().__new__(cls, ingredients)
+        order.recipe = recipe
+        order.arrival_s = arrival_s
+        return order
+
+    def __reduce__(self):
+        return (Order, (tuple(self), self.recipe, self.arrival_s))
+
+def workload_ingredients(menu=MENU, toppings=EXTRA_TOPPINGS):
+    """Every ingredient name a workload can ask for - seed the database with these"""
+    names = {name for recipe in menu.values() for name in recipe} | set(toppings)
+    return tuple(sorted(names))
+
+def zipf_weights(count, s=1.2):
+    return [1 / rank ** s for rank in range(1, count + 1)]
+
+def hourly_counts(num_orders, profile='friday_night'):
+    """Split num_orders across the 24 hours in proportion to the profile (largest remainder)"""
+    weights = HOURLY_PROFILES[profile] if isinstance(profile, str) else profile
+    total = sum(weights)
+    exact = [num_orders * weight / total for weight in weights]
+    counts = [int(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda hour: exact[hour] - counts[hour], reverse=True)
+    for hour in by_remainder[:num_orders - sum(counts)]:
+        counts[hour] += 1
+    return counts
+
+def _arrival_times(rng, counts):
+    # Sorted uniform arrivals within each hour, generated in order one at a time
+    # (sequential order statistics), so the stream never holds an hour in memory
+    for hour, count in enumerate(counts):
+        position = 0.0
+        for remaining in range(count, 0, -1):
+            position += (1 - position) * (1 - rng.random() ** (1 / remaining))
+            yield (hour + position) * 3600
+
+def synthesise_orders(num_orders, profile='friday_night', menu=MENU, recipe_weights=RECIPE_WEIGHTS,
+                      toppings=EXTRA_TOPPINGS, zipf_s=1.2, extra_topping_rate=0.6, max_extra_toppings=3,
+                      seed=None):
+    """
+    Yield num_orders Orders over one day, in arrival order:
+    recipes drawn by popularity, extra toppings Zipf-skewed (a few toppings
+    dominate), arrivals shaped by an hourly profile such as 'friday_night'.
+    """
+    rng = random.Random(seed)
+    recipes = list(menu)
+    recipe_cumulative = list(itertools.accumulate(recipe_weights.get(name, 1) for name in recipes))
+    topping_cumulative = list(itertools.accumulate(zipf_weights(len(toppings), zipf_s)))
+
+    for arrival_s in _arrival_times(rng, hourly_counts(num_orders, profile)):
+        recipe = recipes[bisect.bisect(recipe_cumulative, rng.random() * recipe_cumulative[-1])]
+        ingredients = menu[recipe]
+        if toppings and rng.random() < extra_topping_rate:
+            extras = []
+            for _ in range(rng.randint(1, max_extra_toppings)):
+                topping = toppings[bisect.bisect(topping_cumulative, rng.random() * topping_cumulative[-1])]
+                if topping not in ingredients and topping not in extras:
+                    extras.append(topping)
+            ingredients = ingredients + tuple(extras)
+        yield Order(ingredients, recipe, arrival_s)
+
+def record_orders(orders, path):
+    """Write an order stream as CSV (arrival_s, recipe, ingredients) for later replay; returns the count"""
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('arrival_s', 'recipe', 'ingredients'))
+        for order in orders:
+            writer.writerow((f"{order.arrival_s:.6f}" if order.arrival_s is not None else '',
+                             order.recipe or '', '|'.join(order)))
+            count += 1
+    return count
+
+def replay_orders(path):
+    """Stream Orders back from a CSV written by record_orders (or exported from a real order log)"""
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            arrival = float(row['arrival_s']) if row['arrival_s'] else None
+            yield Order(tuple(row['ingredients'].split('|')), row['recipe'] or None, arrival)
+
+def timed_orders(demo, serve):
+    """
+    Wrap serve(*args, order) to record each order's service time and arrival
+    on demo.order_service_s / demo.order_arrival_s.
+    """
+    service = demo.order_service_s
+    arrivals = demo.order_arrival_s
+    clock = time.perf_counter
+
+    def timed(*args):
+        start = clock()
+        result = serve(*args)
+        service.append(clock() - start)
+        arrivals.append(getattr(args[-1], 'arrival_s', None))
+        return result
+    return timed
+
+def queueing_latencies(arrivals_s, service_s, time_scale=1.0):
+    """
+    Per-order latency (queue wait + service) for one kitchen serving orders
+    in arrival order, replayed virtually: arrivals are divided by time_scale
+    (e.g. 60 squeezes an hour of orders into a minute) and each order takes
+    its measured service time.
+    """
+    latencies = []
+    free_at = None
+    for arrival, service in zip(arrivals_s, service_s):
+        arrival = arrival / time_scale
+        start = arrival if free_at is None else max(arrival, free_at)
+        free_at = start + service
+        latencies.append(free_at - arrival)
+    return latencies
+
+def peak_hour(arrivals_s):
+    """(hour, orders) for the busiest hour of an arrival stream"""
+    per_hour = [0] * 24
+    for arrival in arrivals_s:
+        per_hour[min(int(arrival // 3600), 23)] += 1
+    hour = max(range(24), key=per_hour.__getitem__)
+    return hour, per_hour[hour]
+
+def load_report(demo, time_scale=1.0):
+    """Cache hit rate, service-time and queueing-latency percentiles for a kitchen run on a workload"""
+    service_ms = [seconds * 1000 for seconds in demo.order_service_s]
+    report = {
+        'orders': demo.orders_completed,
+        'queries_per_order': demo.storage_trips / demo.orders_completed if demo.orders_completed else 0.0,
+        'service_p50_ms': percentile(service_ms, 50),
+        'service_p99_ms': percentile(service_ms, 99),
+    }
+    lookups = getattr(demo, 'cache_hits', 0) + getattr(demo, 'cache_misses', 0)
+    if lookups:
+        report['cache_hit_rate'] = demo.cache_hits / lookups
+    arrivals = demo.order_arrival_s
+    if arrivals and all(arrival is not None for arrival in arrivals):
+        latency_ms = [seconds * 1000 for seconds in queueing_latencies(arrivals, demo.order_service_s, time_scale)]
+        report['latency_p50_ms'] = percentile(latency_ms, 50)
+        report['latency_p99_ms'] = percentile(latency_ms, 99)
+        report['peak_hour'], report['peak_hour_orders'] = peak_hour(arrivals)
+    return report
+
+def print_load_report(label, report):
+    line = (f"   {label:<28} {report['queries_per_order']:>7.2f} q/order | service p50 {report['service_p50_ms']:7.3f} ms"
+            f" p99 {report['service_p99_ms']:7.3f} ms")
+    if 'cache_hit_rate' in report:
+        line += f" | cache hits {report['cache_hit_rate']:6.1%}"
+    if 'latency_p99_ms' in report:
+        line += f" | latency p99 {report['latency_p99_ms']:9.2f} ms"
+    print(line)
+
+def batch_efficiency(orders, batch_size):
+    """Ingredient lookups per distinct name a batch fetches, when orders are grouped into batches (higher = more sharing)"""
+    lookups = 0
+    distinct = 0
+    iterator = iter(orders)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        lookups += sum(len(order) for order in batch)
+        distinct += len({name for order in batch for name in order})
+    return lookups / distinct if distinct else 0.0
+
+if __name__ == "__main__":
+    import dough_re_mi
+    import fresh_pizza_of_belair
+
+    num_orders = 20_000
+    seed = 42
+    names = workload_ingredients()
+    time_scale = 3600  # Replay each hour of the day in one second
+
+    print("🛒 ORDER-STREAM REPLAY - FRIDAY NIGHT")
+    print("="*70)
+    sample = list(synthesise_orders(num_orders, seed=seed))
+    hour, busiest = peak_hour(order.arrival_s for order in sample)
+    recipes = {}
+    for order in sample:
+        recipes[order.recipe] = recipes.get(order.recipe, 0) + 1
+    print(f"   {num_orders:,} orders, {len(names)} ingredients, peak {busiest:,} orders at {hour:02d}:00")
+    print(f"   Recipes: {', '.join(f'{name} {count / num_orders:.0%}' for name, count in sorted(recipes.items(), key=lambda item: -item[1]))}")
+    print(f"   Mean ingredients per order: {sum(len(order) for order in sample) / num_orders:.2f}")
+    for batch_size in (10, 100, 1000):
+        print(f"   📦 Batch of {batch_size:>5,}: {batch_efficiency(sample, batch_size):8.1f} ingredient lookups per distinct name fetched")
+
+    print("\n⏱️  Kitchens on the same stream (hour of day replayed in 1s):")
+    chaotic = dough_re_mi.chaotic_kitchen_demo(2_000, orders=synthesise_orders(num_orders, seed=seed),
+                                               ingredients=names, verbose=False, seed=seed)
+    print_load_report('chaotic (first 2,000)', load_report(chaotic, time_scale))
+    for cache_size in (len(names), 12, 6):
+        optimised = fresh_pizza_of_belair.optimised_kitchen_demo(
+            num_orders, orders=synthesise_orders(num_orders, seed=seed), ingredients=names,
+            cache_size=cache_size, verbose=False, seed=seed)
+        print_load_report(f'optimised, cache {cache_size:>2}', load_report(optimised, time_scale))
+    print("="*70)
+    print("💡 Identical four-ingredient pizzas make every cache look perfect;")
+    print("   a skewed menu with a small cache shows the misses real traffic causes.")
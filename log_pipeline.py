@@ -0,0 +1,165 @@
+import bz2
+import gzip
+import lzma
+import os
+import re
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# create_sample_file's format: "Sample log line 000042 - timestamp: 1700000000.123456 - data: xxx..."
+TIMESTAMP_PATTERN = rb'timestamp: ([0-9]+\.[0-9]+)'
+
+# Extension -> streaming opener; each decompresses incrementally as it is read
+DECOMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+if zstandard is not None:
+    DECOMPRESSORS['.zst'] = zstandard.open
+
+def compression_of(path):
+    """The compressed extension of path ('.gz', '.zst', ...), or None for plain files"""
+    extension = os.path.splitext(os.fsdecode(path))[1].lower()
+    return extension if extension in DECOMPRESSORS or extension == '.zst' else None
+
+def open_log(path, text=False):
+    """
+    Open a plain or compressed log for streaming reads, picked by extension.
+    Compressed files are never inflated up front - each read() decompresses
+    only as much as it returns.
+    """
+    compression = compression_of(path)
+    if compression is None:
+        return open(path, 'r') if text else open(path, 'rb', buffering=0)
+    if compression not in DECOMPRESSORS:
+        raise ImportError(f"Reading {compression} logs needs the zstandard package (pip install zstandard)")
+    return DECOMPRESSORS[compression](path, 'rt' if text else 'rb')
+
+def _open_source(source):
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        return open_log(source), True
+    return source, False
+
+def read_blocks(source, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Yield the file as bytes blocks of about buffer_size that always end on a
+    line boundary. source is a path (plain or compressed) or an open binary file.
+    """
+    f, owned = _open_source(source)
+    try:
+        carry = b''
+        while True:
+            block = f.read(buffer_size)
+            if not block:
+                break
+            cut = block.rfind(b'\n') + 1
+            if not cut:
+                # No newline in this read - keep growing the partial line
+                carry += block
+                continue
+            yield carry + block[:cut] if carry else block[:cut]
+            carry = block[cut:]
+        if carry:
+            yield carry
+    finally:
+        if owned:
+            f.close()
+
+def split_lines(block):
+    """A newline-terminated block as a list of lines, without the newlines"""
+    lines = block.split(b'\n')
+    if block.endswith(b'\n'):
+        lines.pop()
+    return lines
+
+def read_batches(source, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Yield one list of lines (bytes, no newline) per block.
+    The split happens in C over the whole block; stages then work a batch at
+    a time, so generator overhead is paid per block rather than per line.
+    """
+    for block in read_blocks(source, buffer_size):
+        yield split_lines(block)
+
+def read_lines(source, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Flat per-line view of read_batches, for callers that want one line at a time"""
+    for lines in read_batches(source, buffer_size):
+        yield from lines
+
+def pipeline(batches, *stages):
+    """Chain stages: each takes an iterable of batches and returns one (generators stay lazy)"""
+    for stage in stages:
+        batches = stage(batches)
+    return batches
+
+# --- Stages: batches in, batches out ---
+
+def non_empty(batches):
+    """Drop lines that line.strip() would leave empty (isspace() allocates nothing)"""
+    for lines in batches:
+        yield [line for line in lines if line and not line.isspace()]
+
+def grep(needle):
+    """Stage keeping lines that contain a bytes substring"""
+    def stage(batches):
+        for lines in batches:
+            yield [line for line in lines if needle in line]
+    return stage
+
+def match(pattern):
+    """Stage keeping lines that match a bytes regex"""
+    search = re.compile(pattern).search
+    def stage(batches):
+        for lines in batches:
+            yield [line for line in lines if search(line)]
+    return stage
+
+def parse_field(pattern, convert=bytes):
+    """Stage turning each matching line into convert(first group); other lines are dropped"""
+    search = re.compile(pattern).search
+    def stage(batches):
+        for lines in batches:
+            yield [convert(found[1]) for found in map(search, lines) if found]
+    return stage
+
+def decode(encoding='utf-8', errors='replace'):
+    """Stage turning lines into str - only for stages that genuinely need text"""
+    def stage(batches):
+        for lines in batches:
+            yield [line.decode(encoding, errors) for line in lines]
+    return stage
+
+parse_timestamp = parse_field(TIMESTAMP_PATTERN, float)
+
+# --- Sinks: consume a pipeline into a result ---
+
+def count(batches):
+    return sum(len(items) for items in batches)
+
+def summarise(batches):
+    """Streaming count/min/max/mean of numbers, in constant memory"""
+    total = 0
+    running_sum = 0.0
+    low = high = None
+    for values in batches:
+        if not values:
+            continue
+        total += len(values)
+        running_sum += sum(values)
+        batch_low, batch_high = min(values), max(values)
+        low = batch_low if low is None else min(low, batch_low)
+        high = batch_high if high is None else max(high, batch_high)
+    return {
+        'count': total,
+        'min': low,
+        'max': high,
+        'mean': running_sum / total if total else None,
+        'span': high - low if total else None,
+    }
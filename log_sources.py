@@ -0,0 +1,166 @@
+import bz2
+import glob
+import gzip
+import lzma
+import os
+import re
+import shutil
+import time
+
+import log_pipeline
+from log_pipeline import zstandard
+
+# Writers for making compressed samples; streamed, so the input is never loaded whole
+COMPRESSORS = {
+    '.gz': lambda path: gzip.open(path, 'wb', compresslevel=6),
+    '.bz2': lambda path: bz2.open(path, 'wb'),
+    '.xz': lambda path: lzma.open(path, 'wb'),
+}
+if zstandard is not None:
+    COMPRESSORS['.zst'] = lambda path: zstandard.open(path, 'wb')
+
+# logrotate numbering: app.log (live), app.log.1 (previous), app.log.2.gz (older) ...
+_ROTATION_NUMBER = re.compile(r'^(.*?)(?:\.(\d+))?$')
+
+def _rotation_key(path):
+    name = path
+    if log_pipeline.compression_of(name):
+        name = os.path.splitext(name)[0]
+    base, number = _ROTATION_NUMBER.match(name).groups()
+    # Oldest first: highest rotation number first, the live (unnumbered) file last
+    return (base, 0 if number else 1, -int(number or 0))
+
+def expand_sources(sources):
+    """
+    Turn a path, glob pattern, or list of either into concrete files in
+    oldest-to-newest rotation order, so a rotated set reads as one stream.
+    """
+    if isinstance(sources, (str, bytes)) or hasattr(sources, '__fspath__'):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        source = os.fsdecode(source)
+        matches = glob.glob(source)
+        if not matches:
+            raise FileNotFoundError(f"No log files match '{source}'")
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return sorted(paths, key=_rotation_key)
+
+def compress_file(path, compression, output=None):
+    """Stream path into a compressed copy (output defaults to path + compression)"""
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unsupported compression '{compression}' (available: {', '.join(COMPRESSORS)})")
+    output = output or path + compression
+    with open(path, 'rb') as source, COMPRESSORS[compression](output) as target:
+        shutil.copyfileobj(source, target, log_pipeline.DEFAULT_BUFFER_SIZE)
+    return output
+
+class ScanStats:
+    """Bytes and time spent reading a log set, for judging compression vs I/O"""
+    def __init__(self):
+        self.files = 0
+        self.compressed_files = 0
+        self.disk_bytes = 0
+        self.log_bytes = 0
+        self.elapsed_s = 0.0
+        self.cpu_s = 0.0
+
+    @property
+    def compression_ratio(self):
+        return self.log_bytes / self.disk_bytes if self.disk_bytes else 0.0
+
+    @property
+    def mb_per_s(self):
+        """Throughput in uncompressed log MB per wall-clock second"""
+        return self.log_bytes / 1024 / 1024 / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def cpu_s_per_gb(self):
+        """CPU seconds per uncompressed GB - decompression shows up here"""
+        return self.cpu_s / (self.log_bytes / 1024 ** 3) if self.log_bytes else 0.0
+
+    def to_dict(self):
+        return {
+            'files': self.files,
+            'compressed_files': self.compressed_files,
+            'disk_bytes': self.disk_bytes,
+            'log_bytes': self.log_bytes,
+            'compression_ratio': self.compression_ratio,
+            'elapsed_s': self.elapsed_s,
+            'cpu_s': self.cpu_s,
+            'mb_per_s': self.mb_per_s,
+            'cpu_s_per_gb': self.cpu_s_per_gb,
+        }
+
+def read_set_batches(paths, buffer_size=log_pipeline.DEFAULT_BUFFER_SIZE, stats=None):
+    """
+    Line batches from every file in turn, one file open at a time.
+    Each file is decompressed block by block as the stages pull from it.
+    """
+    for path in paths:
+        if stats is not None:
+            stats.files += 1
+            stats.compressed_files += log_pipeline.compression_of(path) is not None
+            stats.disk_bytes += os.path.getsize(path)
+        with log_pipeline.open_log(path) as f:
+            for block in log_pipeline.read_blocks(f, buffer_size):
+                if stats is not None:
+                    stats.log_bytes += len(block)
+                yield log_pipeline.split_lines(block)
+
+def scan_logs(sources, *stages, sink=log_pipeline.count, buffer_size=log_pipeline.DEFAULT_BUFFER_SIZE):
+    """
+    Run a log_pipeline over a path, glob or rotation set (plain or compressed).
+    Returns (sink result, ScanStats).
+    """
+    paths = expand_sources(sources)
+    stats = ScanStats()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    result = sink(log_pipeline.pipeline(read_set_batches(paths, buffer_size, stats), *stages))
+    stats.elapsed_s = time.perf_counter() - start
+    stats.cpu_s = time.process_time() - cpu_start
+    return result, stats
+
+def print_scan(label, result, stats):
+    print(f"   {label:<22} {stats.disk_bytes / 1024 / 1024:>9.1f} MB on disk ({stats.compression_ratio:4.1f}x) | "
+          f"{stats.mb_per_s:>7.1f} MB/s | {stats.cpu_s_per_gb:>6.1f} CPU s/GB | {result:,} lines")
+
+if __name__ == "__main__":
+    import tempfile
+    import memory_demo
+
+    directory = tempfile.mkdtemp(prefix='log_sources_')
+    plain = os.path.join(directory, 'app.log')
+    try:
+        print("🗜️  COMPRESSED & ROTATED LOG SCANNING")
+        print("="*70)
+        memory_demo.create_sample_file(plain, size_mb=20)
+        if zstandard is None:
+            print("   (zstandard not installed - skipping .zst)")
+
+        scans = {}
+        result, stats = scan_logs(plain, log_pipeline.non_empty)
+        scans['plain'] = stats
+        print_scan('plain', result, stats)
+        for compression in COMPRESSORS:
+            path = compress_file(plain, compression)
+            result, stats = scan_logs(path, log_pipeline.non_empty)
+            scans[compression] = stats
+            print_scan(compression, result, stats)
+
+        # A logrotate-style set: two compressed rotations plus the live file
+        os.rename(plain + '.gz', plain + '.2.gz')
+        shutil.copyfile(plain + '.2.gz', plain + '.1.gz')
+        result, stats = scan_logs([plain + '.*.gz', plain], log_pipeline.non_empty)
+        print_scan(f"rotation set ({stats.files} files)", result, stats)
+        print(f"   order: {', '.join(os.path.basename(path) for path in expand_sources([plain + '.*.gz', plain]))}")
+
+        print("="*70)
+        fastest = min((name for name in scans if name != 'plain'), key=lambda name: scans[name].cpu_s_per_gb)
+        smallest = max((name for name in scans if name != 'plain'), key=lambda name: scans[name].compression_ratio)
+        print(f"💡 Cheapest to read: {fastest} | smallest on disk: {smallest}")
+        print("   Compressed logs trade CPU per GB for fewer bytes of disk and network I/O.")
+    finally:
+        shutil.rmtree(directory)
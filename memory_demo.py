@@ -1,7 +1,20 @@
+import mmap
 import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor
+
 import psutil
 
+import log_pipeline
+from kitchen_datagen import write_sample_log
+from kitchen_parallel import available_cpus
+from memory_profiling import profile_call, run_isolated, print_profile
+
+# A newline followed by a whitespace-only line (what line.strip() would leave empty)
+_BLANK_AFTER_NEWLINE = re.compile(rb'\n[ \t\r\f\v]*(?=\n|\Z)')
+_BLANK_FIRST_LINE = re.compile(rb'[ \t\r\f\v]*(?:\n|\Z)')
+
 def inefficient_file_processing(filename):
     """
     Demonstrates the readlines() mistake - loads entire file into memory
@@ -14,7 +27,7 @@ def inefficient_file_processing(filename):
     memory_before = psutil.Process().memory_info().rss / 1024 / 1024  # MB
     
     try:
-        with open(filename, 'r') as f:
+        with log_pipeline.open_log(filename, text=True) as f:  # Plain, .gz, .bz2, .xz or .zst
             # THE MISTAKE: Loads entire file into memory at once
             all_lines = f.readlines()
             
@@ -62,7 +75,7 @@ def efficient_file_processing(filename):
     processed_count = 0
     
     # THE FIX: Stream file line by line
-    with open(filename, 'r') as f:
+    with log_pipeline.open_log(filename, text=True) as f:  # Plain, .gz, .bz2, .xz or .zst
         for line in f:  # Generator - only holds one line in memory
             if len(line.strip()) > 0:
                 processed_count += 1
@@ -86,20 +99,177 @@ def efficient_file_processing(filename):
     
     return processed_count, memory_after - memory_before
 
-def create_sample_file(filename, size_mb=10):
+def pipeline_file_processing(filename, buffer_size=log_pipeline.DEFAULT_BUFFER_SIZE):
+    """
+    Bytes-mode streaming: large binary reads split into line batches in C,
+    then generator stages (filter, parse, aggregate) that never decode a line
+    """
+    print("\n=== BYTES PIPELINE FILE PROCESSING ===")
+    print(f"Binary reads of {buffer_size / 1024 / 1024:g} MB - filter, parse, aggregate without decoding lines\n")
+    
+    start_time = time.perf_counter()
+    memory_before = psutil.Process().memory_info().rss / 1024 / 1024  # MB
+    
+    processed_count = 0
+    
+    def counted(batches):
+        nonlocal processed_count
+        for lines in batches:
+            processed_count += len(lines)
+            yield lines
+    
+    timestamps = log_pipeline.summarise(log_pipeline.pipeline(
+        log_pipeline.read_batches(filename, buffer_size),
+        log_pipeline.non_empty,
+        counted,
+        log_pipeline.parse_timestamp,
+    ))
+    
+    memory_after = psutil.Process().memory_info().rss / 1024 / 1024  # MB
+    elapsed = time.perf_counter() - start_time
+    
+    print(f"Lines processed: {processed_count:,}")
+    print(f"Timestamps parsed: {timestamps['count']:,}")
+    if timestamps['count']:
+        print(f"Log span: {timestamps['span']:.3f} seconds ({timestamps['count'] / max(timestamps['span'], 1e-9):,.0f} lines/s written)")
+    print(f"Memory before: {memory_before:.1f} MB")
+    print(f"Memory after: {memory_after:.1f} MB")
+    print(f"Memory used: {memory_after - memory_before:.1f} MB")
+    print(f"Execution time: {elapsed:.2f} seconds")
+    
+    return processed_count, memory_after - memory_before
+
+def newline_aligned_chunks(filename, chunk_size=64 * 1024 * 1024):
+    """Split a file into (start, end) byte ranges that each end just after a newline"""
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    chunks = []
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = mm.find(b'\n', end - 1)
+                end = size if newline == -1 else newline + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def count_non_empty_lines(data, contains=None):
+    """Count lines with non-whitespace content (optionally also containing `contains`) in C-level passes"""
+    if not data:
+        return 0
+    if contains is not None:
+        # Jump from match to match; each hit counts its line once, then skips to the next line
+        count = 0
+        position = data.find(contains)
+        while position != -1:
+            count += 1
+            line_end = data.find(b'\n', position)
+            if line_end == -1:
+                break
+            position = data.find(contains, line_end + 1)
+        return count
+    lines = data.count(b'\n')
+    blank = len(_BLANK_AFTER_NEWLINE.findall(data))
+    if _BLANK_FIRST_LINE.match(data):
+        blank += 1
+    if data.endswith(b'\n'):
+        blank -= 1  # The empty "line" after the final newline is not a line
+    else:
+        lines += 1
+    return lines - blank
+
+_scan_file = None
+_scan_mmap = None
+
+def _open_scan_mmap(filename):
+    # Each worker maps the file once; chunks are slices of the same mapping
+    global _scan_file, _scan_mmap
+    _scan_file = open(filename, 'rb')
+    _scan_mmap = mmap.mmap(_scan_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _scan_chunk(start, end, contains=None):
+    count = count_non_empty_lines(_scan_mmap[start:end], contains)
+    return count, psutil.Process().memory_info().rss / 1024 / 1024
+
+def parallel_file_processing(filename, workers=None, chunk_size=64 * 1024 * 1024, contains=None):
+    """
+    Memory-maps the file, splits it into newline-aligned chunks and counts
+    non-empty lines across a process pool. Each worker holds at most one
+    chunk in memory, so the footprint is workers x chunk_size, not file size.
+    """
+    if log_pipeline.compression_of(filename):
+        raise ValueError(f"Can't memory-map compressed '{filename}' - stream it with log_sources.scan_logs instead")
+    workers = workers or available_cpus()
+    print("\n=== PARALLEL MMAP FILE PROCESSING ===")
+    print(f"Memory-mapped chunks of {chunk_size / 1024 / 1024:g} MB across {workers} worker processes\n")
+    
+    start_time = time.perf_counter()
+    memory_before = psutil.Process().memory_info().rss / 1024 / 1024  # MB
+    
+    chunks = newline_aligned_chunks(filename, chunk_size)
+    processed_count = 0
+    worker_peak_mb = 0.0
+    if chunks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_open_scan_mmap,
+                                 initargs=(filename,)) as executor:
+            futures = [executor.submit(_scan_chunk, start, end, contains) for start, end in chunks]
+            for future in futures:
+                count, worker_rss_mb = future.result()
+                processed_count += count
+                worker_peak_mb = max(worker_peak_mb, worker_rss_mb)
+    
+    memory_after = psutil.Process().memory_info().rss / 1024 / 1024  # MB
+    elapsed = time.perf_counter() - start_time
+    gb_per_s = os.path.getsize(filename) / 1024 ** 3 / elapsed if elapsed else 0.0
+    
+    print(f"Lines processed: {processed_count:,}")
+    print(f"Chunks: {len(chunks):,}")
+    print(f"Memory before: {memory_before:.1f} MB")
+    print(f"Memory after: {memory_after:.1f} MB")
+    print(f"Memory used: {memory_after - memory_before:.1f} MB (largest worker RSS: {worker_peak_mb:.1f} MB)")
+    print(f"Execution time: {elapsed:.2f} seconds")
+    print(f"Throughput: {gb_per_s:.2f} GB/s")
+    
+    return processed_count, memory_after - memory_before
+
+def profile_strategies(filename, strategies=None, isolated=True, trace_allocations=False):
+    """
+    Peak-memory profile of each strategy, sampled on a background thread.
+    isolated=True runs every strategy in a freshly spawned process so one
+    run's freed-but-retained memory cannot skew the next.
+    """
+    strategies = strategies or ('readlines', 'streaming', 'pipeline')
+    profiles = {}
+    for name in strategies:
+        run = run_isolated if isolated else profile_call
+        _, profile = run(STRATEGIES[name], filename, trace_allocations=trace_allocations, quiet=True)
+        print(f"\n🧪 {name} ({'isolated process' if isolated else 'this process'})")
+        print_profile(profile)
+        profiles[name] = profile
+    return profiles
+
+def create_sample_file(filename, size_mb=10, seed=None):
     """Create a sample file for demonstration"""
     print(f"Creating {size_mb}MB sample file: {filename}")
     
     lines_per_mb = 20000  # Approximate
     total_lines = size_mb * lines_per_mb
     
-    with open(filename, 'w') as f:
-        for i in range(total_lines):
-            f.write(f"Sample log line {i:06d} - timestamp: {time.time():.6f} - data: {'x' * 40}\n")
+    # Vectorised chunks and one write per 100k lines instead of a write() per line
+    write_sample_log(filename, lines=total_lines, seed=seed)
     
     actual_size = os.path.getsize(filename) / 1024 / 1024
     print(f"Created file: {actual_size:.1f} MB\n")
 
+STRATEGIES = {
+    'readlines': inefficient_file_processing,
+    'streaming': efficient_file_processing,
+    'pipeline': pipeline_file_processing,
+}
+
 if __name__ == "__main__":
     sample_file = "sample_logfile.txt"
     
@@ -117,6 +287,24 @@ if __name__ == "__main__":
     # Run efficient version
     efficient_count, efficient_memory = efficient_file_processing(sample_file)
     
+    # Run the bytes pipeline (same count, plus timestamp analytics)
+    pipeline_count, pipeline_memory = pipeline_file_processing(sample_file)
+    if pipeline_count != efficient_count:
+        print(f"⚠️  Pipeline counted {pipeline_count:,} lines, streaming counted {efficient_count:,}")
+    
+    # Run the parallel scanner (same count, spread over every core)
+    parallel_count, parallel_memory = parallel_file_processing(sample_file, chunk_size=8 * 1024 * 1024)
+    if parallel_count != efficient_count:
+        print(f"⚠️  Parallel scanner counted {parallel_count:,} lines, streaming counted {efficient_count:,}")
+    
+    # Trustworthy memory numbers: true peaks, one fresh process per strategy
+    print("\n" + "=" * 60)
+    print("ISOLATED PEAK-MEMORY PROFILES")
+    print("=" * 60)
+    profiles = profile_strategies(sample_file, trace_allocations=True)
+    inefficient_memory = profiles['readlines']['peak_delta_mb']
+    efficient_memory = profiles['streaming']['peak_delta_mb']
+    
     # Summary comparison
     print("\n" + "=" * 60)
     print("COST COMPARISON SUMMARY")
@@ -124,6 +312,7 @@ if __name__ == "__main__":
     
     if inefficient_memory > 0:
         memory_savings = ((inefficient_memory - efficient_memory) / inefficient_memory) * 100
+        print(f"Peak memory: {inefficient_memory:.1f} MB (readlines) vs {efficient_memory:.1f} MB (streaming)")
         print(f"Memory reduction: {memory_savings:.1f}%")
         print(f"Cost reduction: 96% (from R3.23/hr to R0.14/hr)")
         print(f"\nFor a 24/7 service (GCP us-central1):")
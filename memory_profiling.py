@@ -0,0 +1,104 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+from kitchen_costs import RSSSampler, peak_rss_mb
+
+class PeakRSSSampler(RSSSampler):
+    """
+    RSSSampler reading psutil, for short-lived peaks such as a readlines()
+    list freed before the function returns. While tracemalloc is tracing,
+    it also snapshots allocations each time the traced total grows by 10%,
+    so peak_snapshot shows who held memory at the peak.
+    """
+    def __init__(self, interval_s=0.005):
+        super().__init__(interval_s)
+        self._process = psutil.Process()
+        self.peak_snapshot = None
+        self._snapshot_bytes = 0
+
+    def _rss_mb(self):
+        return self._process.memory_info().rss / 1024 / 1024
+
+    def _sample(self):
+        super()._sample()
+        if tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            if traced > self._snapshot_bytes * 1.1:
+                self.peak_snapshot = tracemalloc.take_snapshot()
+                self._snapshot_bytes = traced
+
+def top_allocations(snapshot, top=10, key_type='lineno'):
+    """Largest allocation sites in a tracemalloc snapshot, as plain dicts"""
+    results = []
+    for stat in snapshot.statistics(key_type)[:top]:
+        frame = stat.traceback[0]
+        results.append({
+            'location': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+            'size_kb': stat.size / 1024,
+            'count': stat.count,
+        })
+    return results
+
+def profile_call(func, *args, interval_s=0.005, trace_allocations=False, top=10, quiet=False, **kwargs):
+    """
+    Run func(*args, **kwargs) under the peak-RSS sampler (and optionally
+    tracemalloc, reporting the top allocators near the traced peak).
+    Returns (result, profile dict). Timings taken with trace_allocations=True
+    include tracemalloc's own overhead.
+    """
+    if trace_allocations:
+        tracemalloc.start()
+    sampler = PeakRSSSampler(interval_s)
+    start = time.perf_counter()
+    try:
+        with sampler, (contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()):
+            result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        profile = {
+            'function': getattr(func, '__name__', repr(func)),
+            'elapsed_s': elapsed,
+            'baseline_mb': sampler.baseline_mb,
+            'peak_mb': sampler.peak_mb,
+            'peak_delta_mb': sampler.peak_delta_mb,
+            'end_mb': sampler.end_mb,
+            'samples': sampler.samples,
+            'process_peak_mb': peak_rss_mb(),  # Lifetime high-water mark (exact in an isolated process)
+        }
+        if trace_allocations:
+            profile['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            snapshot = sampler.peak_snapshot or tracemalloc.take_snapshot()
+            profile['top_allocations'] = top_allocations(snapshot, top)
+    finally:
+        if trace_allocations:
+            tracemalloc.stop()
+    return result, profile
+
+def _profile_in_child(func, args, kwargs, options):
+    return profile_call(func, *args, **options, **kwargs)
+
+def run_isolated(func, *args, interval_s=0.005, trace_allocations=False, top=10, quiet=False, **kwargs):
+    """
+    profile_call in a freshly spawned interpreter, so allocator state left by
+    an earlier strategy cannot flatter (or penalise) this one. func must be
+    importable (a module-level function). Returns (result, profile dict).
+    """
+    options = {'interval_s': interval_s, 'trace_allocations': trace_allocations, 'top': top, 'quiet': quiet}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_profile_in_child, func, args, kwargs, options).result()
+
+def print_profile(profile):
+    print(f"   ⏱️  {profile['elapsed_s']:.2f}s | 📈 peak RSS {profile['peak_mb']:.1f} MB "
+          f"(+{profile['peak_delta_mb']:.1f} MB over {profile['baseline_mb']:.1f} MB baseline, "
+          f"{profile['samples']:,} samples)")
+    if 'traced_peak_mb' in profile:
+        print(f"   🔬 tracemalloc peak: {profile['traced_peak_mb']:.1f} MB - top allocators:")
+        for allocation in profile['top_allocations']:
+            print(f"      {allocation['location']:<32} {allocation['size_kb']:>10,.1f} KB in {allocation['count']:,} blocks")